@@ -0,0 +1,70 @@
+"""
+Centralized on-disk cache locations and helpers for cb_schedule package.
+"""
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from cb_schedule.logging_config import setup_logger
+from cb_schedule.yaml_config import SafeLoader
+
+logger = setup_logger(__name__)
+
+
+def cache_dir(*parts: str) -> Path:
+    """Return a cb_schedule cache directory under $XDG_CACHE_HOME (default: ~/.cache)."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base, "cb_schedule", *parts)
+
+
+def _yaml_cache_path(path: Path) -> Path:
+    digest = hashlib.sha256(str(path.resolve()).encode()).hexdigest()
+    return cache_dir("yaml") / f"{digest}.pkl"
+
+
+def load_yaml_cached(path: Path) -> Any:
+    """
+    Load a YAML file, reusing a pickled copy of the parsed data while its mtime and size are unchanged.
+
+    Raises FileNotFoundError if the file doesn't exist. A missing or unreadable cache entry just
+    means the file is parsed again.
+    """
+    stat = path.stat()
+    cache_path = _yaml_cache_path(path)
+
+    try:
+        with open(cache_path, "rb") as f:
+            mtime_ns, size, data = pickle.load(f)
+        if (mtime_ns, size) == (stat.st_mtime_ns, stat.st_size):
+            return data
+    except FileNotFoundError:
+        pass
+    # What a truncated, corrupt or old-format pickle can raise; anything else is a bug and propagates
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError, AttributeError) as e:
+        logger.warning(f"Ignoring unreadable YAML cache {cache_path}: {e}")
+
+    data = yaml.load(path.read_bytes(), Loader=SafeLoader)
+    store_yaml_cache(path, data)
+    return data
+
+
+def store_yaml_cache(path: Path, data: Any) -> None:
+    """Record data as the parsed contents of path as it is on disk now."""
+    stat = path.stat()
+    cache_path = _yaml_cache_path(path)
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+
+    # The cache is an optimization; never fail the caller because it can't be written
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump((stat.st_mtime_ns, stat.st_size, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        tmp_path.unlink(missing_ok=True)
+        logger.warning(f"Could not write YAML cache {cache_path}: {e}")
@@ -4,10 +4,28 @@ Centralized logging configuration for cb_schedule package.
 
 import logging
 
+PACKAGE_LOGGER = "cb_schedule"
+
+
+def _configure_package_logger() -> None:
+    """Install the single handler on the package logger; module loggers propagate up to it."""
+    logger = logging.getLogger(PACKAGE_LOGGER)
+    handler: logging.Handler = logging.StreamHandler()  # type: ignore
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+    # Keep records away from the root logger so they aren't printed twice if it is also configured
+    logger.propagate = False
+
+
+# Runs once, the first time this module is imported
+_configure_package_logger()
+
 
 def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     """
-    Set up and return a logger with consistent formatting.
+    Return a logger under the cb_schedule package logger.
 
     Args:
         name: Logger name (typically __name__)
@@ -16,14 +34,10 @@ def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     Returns:
         Configured logger instance
     """
+    # Scripts run with `python -m` are named __main__; keep them under the package handler too
+    if name != PACKAGE_LOGGER and not name.startswith(f"{PACKAGE_LOGGER}."):
+        name = f"{PACKAGE_LOGGER}.{name}"
+
     logger = logging.getLogger(name)
     logger.setLevel(level)
-
-    # Only add handler if none exists to avoid duplicates
-    if not logger.handlers:
-        handler: logging.Handler = logging.StreamHandler()  # type: ignore
-        formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-
     return logger
@@ -4,19 +4,63 @@ Publish a static ferry schedule site with HTML pages for multiple days.
 """
 
 import argparse
+import gzip
+import hashlib
+import json
+import os
 import shutil
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, timedelta
+from itertools import repeat
 from pathlib import Path
-from typing import Any, Dict, List
-from jinja2 import Environment, FileSystemLoader, select_autoescape
-from cb_schedule.render_day import get_ferries_for_day, render_day_html, load_schedule
+from typing import Any, Dict, List, Optional, Tuple
+from jinja2 import Template
+from cb_schedule.render_day import (
+    FerryInfo,
+    ScheduleIndex,
+    generation_timestamp,
+    get_environment,
+    load_schedule,
+    render_day_html,
+    write_day_html,
+)
 
 # Configure logger
 from cb_schedule.logging_config import setup_logger
 
 logger = setup_logger(__name__)
 
+# Brotli copies are written alongside gzip ones when the brotli package is installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# (ferries, services, timezone) for one date
+DaySchedule = Tuple[List[FerryInfo], List[Dict[str, Any]], str]
+
+# Per-date input digests from the previous publish, stored in the output directory
+BUILD_MANIFEST = ".build_manifest.json"
+
+# Precompressed copies written next to each page by publish --compress
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+
+def _ensure_dir(path: Path) -> None:
+    """
+    Create a directory and any missing parents, like Path.mkdir(parents=True, exist_ok=True).
+
+    A directory that already exists costs a single mkdir call, with no separate is_dir() stat.
+    """
+    try:
+        os.mkdir(path)
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        _ensure_dir(path.parent)
+        path.mkdir(exist_ok=True)
+
 
 def copy_static_files(template_dir: Path, output_dir: Path) -> None:
     """Copy CSS and other static files to output directory."""
@@ -30,87 +74,240 @@ def copy_static_files(template_dir: Path, output_dir: Path) -> None:
 
 
 def generate_index_html(
-    template_dir: Path, output_dir: Path, date_range: List[date], title: str = "Ferry Schedule"
+    template: Template,
+    output_dir: Path,
+    date_range: List[date],
+    title: str = "Ferry Schedule",
+    compress: bool = False,
 ) -> None:
     """Generate a simple index.html that redirects to today's date."""
-    # Set up Jinja2 environment
-    env = Environment(loader=FileSystemLoader(template_dir), autoescape=select_autoescape(["html", "xml"]))
+    # Format the dates here so the template loop only emits ready-made strings
+    available_dates = [d.isoformat() for d in date_range]
+    template_data = {"title": title, "available_dates": available_dates, "fallback_date": available_dates[0]}
 
-    # Load template
-    template = env.get_template("home.html")
+    index_path = output_dir / "index.html"
+    if compress:
+        write_page_bytes(index_path, template.render(**template_data).encode("utf-8"), compress)
+    else:
+        template.stream(**template_data).dump(str(index_path), encoding="utf-8")
+        remove_compressed_copies(index_path)
+    logger.info(f"Generated index: {index_path}")
 
-    # Prepare template data
-    template_data = {"title": title, "available_dates": date_range, "fallback_date": date_range[0].isoformat()}
 
-    # Render HTML
-    index_content = template.render(**template_data)
+# Interned to match the interned FerryInfo.start_location/end_location values, so == hits the identity fast path
+HOME_ISLAND = sys.intern("Chebeague Island")
 
-    index_path = output_dir / "index.html"
-    with open(index_path, "w") as f:
-        f.write(index_content)
-    logger.info(f"Generated index: {index_path}")
 
+def write_compressed_copies(page_path: Path, data: bytes) -> None:
+    """Write page.gz, and page.br if brotli is installed, for static servers to send as-is."""
+    # mtime=0 keeps the gzip bytes identical across publishes of an unchanged page
+    Path(f"{page_path}.gz").write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        Path(f"{page_path}.br").write_bytes(brotli.compress(data, quality=11))
 
-def filter_ferries_by_direction(ferries: List[Dict[str, Any]], direction: str) -> List[Dict[str, Any]]:
-    """Filter ferries by arrival/departure direction."""
-    if direction == "arrive":
-        return [f for f in ferries if f.get("end_location") == "Chebeague Island"]
-    elif direction == "depart":
-        return [f for f in ferries if f.get("start_location") == "Chebeague Island"]
+
+def remove_compressed_copies(page_path: Path) -> None:
+    """Delete precompressed copies left by an earlier --compress publish, which would now be stale."""
+    for suffix in COMPRESSED_SUFFIXES:
+        Path(f"{page_path}{suffix}").unlink(missing_ok=True)
+
+
+def write_page_bytes(page_path: Path, data: bytes, compress: bool) -> None:
+    """Write an encoded page, plus its precompressed copies when compress is set."""
+    page_path.write_bytes(data)
+    if compress:
+        write_compressed_copies(page_path, data)
+    else:
+        remove_compressed_copies(page_path)
+
+
+def write_day_page(
+    output_path: Path,
+    target_date: date,
+    ferries: List[FerryInfo],
+    services: List[Dict[str, Any]],
+    timezone: str,
+    template: Template,
+    show_direction_colors: bool = True,
+    generation_time: Optional[str] = None,
+    compress: bool = False,
+) -> None:
+    """Write one day page; compressing needs the whole page in memory, otherwise it is streamed to disk."""
+    if compress:
+        html = render_day_html(
+            target_date, ferries, services, timezone, template, show_direction_colors, generation_time
+        )
+        write_page_bytes(output_path, html.encode("utf-8"), compress)
     else:
-        return ferries
+        write_day_html(
+            output_path, target_date, ferries, services, timezone, template, show_direction_colors, generation_time
+        )
+        remove_compressed_copies(output_path)
+
+
+def partition_ferries(ferries: List[FerryInfo]) -> Tuple[List[FerryInfo], List[FerryInfo]]:
+    """Split ferries into (arrivals, departures) for Chebeague Island in a single pass."""
+    home = HOME_ISLAND
+    arrive: List[FerryInfo] = []
+    depart: List[FerryInfo] = []
+    arrive_append = arrive.append
+    depart_append = depart.append
+    for ferry in ferries:
+        if ferry.end_location == home:
+            arrive_append(ferry)
+        if ferry.start_location == home:
+            depart_append(ferry)
+    return arrive, depart
 
 
 def generate_filtered_pages(
-    schedule_path: Path, template_dir: Path, output_dir: Path, start_date: date, days: int = 30, use_12h: bool = False
+    current_date: date,
+    day_schedule: DaySchedule,
+    template: Template,
+    date_dir: Path,
+    generation_time: Optional[str] = None,
+    compress: bool = False,
 ) -> None:
-    """Generate filtered pages for a date range with structure /<date>/{arrive,depart}/"""
+    """Generate the filtered pages for one date with structure /<date>/{arrive,depart}/"""
+    all_ferries, services, timezone = day_schedule
+    arrive_dir = date_dir / "arrive"
+    depart_dir = date_dir / "depart"
+
+    arrive_ferries, depart_ferries = partition_ferries(all_ferries)
+
+    # Generate arrival page
+    arrive_path = arrive_dir / "index.html"
+    write_day_page(
+        arrive_path,
+        current_date,
+        arrive_ferries,
+        services,
+        timezone,
+        template,
+        show_direction_colors=False,
+        generation_time=generation_time,
+        compress=compress,
+    )
+    logger.debug(f"Generated arrivals: {arrive_path} ({len(arrive_ferries)} ferries)")
+
+    # Generate departure page
+    depart_path = depart_dir / "index.html"
+    write_day_page(
+        depart_path,
+        current_date,
+        depart_ferries,
+        services,
+        timezone,
+        template,
+        show_direction_colors=False,
+        generation_time=generation_time,
+        compress=compress,
+    )
+    logger.debug(f"Generated departures: {depart_path} ({len(depart_ferries)} ferries)")
 
-    # Load schedule data once
-    schedule_data = load_schedule(schedule_path)
 
-    # Generate pages for each date
-    current_date = start_date
-    for i in range(days):
-        # Create date directory
-        date_dir = output_dir / current_date.isoformat()
-        date_dir.mkdir(exist_ok=True)
-
-        # Create arrive/ and depart/ subdirectories under date
-        arrive_dir = date_dir / "arrive"
-        depart_dir = date_dir / "depart"
-        arrive_dir.mkdir(exist_ok=True)
-        depart_dir.mkdir(exist_ok=True)
-
-        # Get all ferries for this day
-        all_ferries, services, timezone = get_ferries_for_day(schedule_data, current_date, use_12h)
-
-        # Generate arrival page
-        arrive_ferries = filter_ferries_by_direction(all_ferries, "arrive")
-        arrive_path = arrive_dir / "index.html"
-        render_day_html(
-            current_date, arrive_ferries, services, timezone, template_dir, arrive_path, show_direction_colors=False
-        )
-        logger.debug(f"Generated arrivals: {arrive_path} ({len(arrive_ferries)} ferries)")
+# Modules whose code shapes the rendered pages, alongside the templates
+RENDERER_SOURCES = (Path(__file__), Path(__file__).with_name("render_day.py"))
 
-        # Generate departure page
-        depart_ferries = filter_ferries_by_direction(all_ferries, "depart")
-        depart_path = depart_dir / "index.html"
-        render_day_html(
-            current_date, depart_ferries, services, timezone, template_dir, depart_path, show_direction_colors=False
-        )
-        logger.debug(f"Generated departures: {depart_path} ({len(depart_ferries)} ferries)")
 
-        current_date += timedelta(days=1)
+def templates_digest(template_dir: Path) -> str:
+    """Fingerprint the HTML templates and rendering code, so that editing either invalidates every page."""
+    digest = hashlib.blake2b(digest_size=16)
+    for source_path in [*sorted(template_dir.glob("*.html")), *RENDERER_SOURCES]:
+        digest.update(source_path.name.encode())
+        digest.update(source_path.read_bytes())
+    return digest.hexdigest()
+
+
+def day_digest(day_schedule: DaySchedule, template_digest: str, compress: bool = False) -> str:
+    """Digest everything a date's pages are rendered from, including whether they are precompressed."""
+    return hashlib.blake2b(repr((day_schedule, template_digest, compress)).encode(), digest_size=16).hexdigest()
+
+
+def load_build_manifest(manifest_path: Path) -> Dict[str, str]:
+    """Load the previous publish's date -> digest manifest, or an empty one if it is missing or unreadable."""
+    try:
+        return json.loads(manifest_path.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def date_pages_exist(output_dir: Path, current_date: date, compress: bool = False) -> bool:
+    """Check that a date's main, arrivals and departures pages (and .gz copies if compressing) are on disk."""
+    date_dir = output_dir / current_date.isoformat()
+    pages = ("index.html", "arrive/index.html", "depart/index.html")
+    if compress:
+        pages += tuple(f"{page}.gz" for page in pages)
+    return all((date_dir / page).exists() for page in pages)
+
+
+def _init_render_worker(template_dir: Path) -> None:
+    """Compile the page templates once when a worker process starts, before it takes any dates."""
+    env = get_environment(template_dir)
+    env.get_template("day.html")
+    env.get_template("ferry_row.html")
+
+
+def render_date_pages(
+    current_date: date,
+    day_schedule: DaySchedule,
+    template_dir: Path,
+    output_dir: Path,
+    generation_time: Optional[str] = None,
+    compress: bool = False,
+) -> None:
+    """Render the main, arrivals and departures pages for one date."""
+    ferries, services, timezone = day_schedule
+
+    # Environments are memoized per process, so each worker compiles day.html once
+    day_template = get_environment(template_dir).get_template("day.html")
+
+    # Create the date directory and its arrive/ and depart/ subdirectories; ensuring arrive/
+    # creates the date directory itself, so it does not need its own mkdir call
+    date_dir = output_dir / current_date.isoformat()
+    _ensure_dir(date_dir / "arrive")
+    _ensure_dir(date_dir / "depart")
+
+    # Generate main day page
+    output_file = date_dir / "index.html"
+    write_day_page(
+        output_file,
+        current_date,
+        ferries,
+        services,
+        timezone,
+        day_template,
+        generation_time=generation_time,
+        compress=compress,
+    )
+    logger.debug(f"Generated: {output_file}")
+
+    generate_filtered_pages(current_date, day_schedule, day_template, date_dir, generation_time, compress)
 
 
 def publish_site(
-    schedule_path: Path, template_dir: Path, output_dir: Path, start_date: date, days: int = 30, use_12h: bool = False
+    schedule_path: Path,
+    template_dir: Path,
+    output_dir: Path,
+    start_date: date,
+    days: int = 30,
+    use_12h: bool = False,
+    jobs: int = 1,
+    force: bool = False,
+    compress: bool = False,
 ) -> None:
-    """Publish a complete static site with multiple day pages."""
+    """
+    Publish a complete static site with multiple day pages.
+
+    Dates are rendered in the current process unless `jobs` asks for worker processes (0 for one
+    per CPU); process startup outweighs rendering for a typical month, so parallelism is opt-in.
+    Dates whose ferries, services and templates are unchanged since the last publish to output_dir
+    are skipped unless force is set. With compress, each page also gets .gz (and, if brotli is
+    installed, .br) copies for the web server to serve.
+    """
 
     # Create output directory
-    output_dir.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(output_dir)
 
     # Load schedule data
     schedule_data = load_schedule(schedule_path)
@@ -118,31 +315,69 @@ def publish_site(
     # Copy static files
     copy_static_files(template_dir, output_dir)
 
-    # Generate pages for date range
-    date_range = []
+    # Look up each day's ferries once; the main and filtered pages all share it
+    index = ScheduleIndex.from_schedule_data(schedule_data)
+    day_schedules: Dict[date, DaySchedule] = {}
     current_date = start_date
-
     for i in range(days):
-        date_range.append(current_date)
-
-        # Get ferries for this day
-        ferries, services, timezone = get_ferries_for_day(schedule_data, current_date, use_12h)
+        day_schedules[current_date] = (
+            index.ferries_for(current_date, use_12h),
+            index.services_for(current_date),
+            index.timezone,
+        )
+        current_date += timedelta(days=1)
 
-        # Create date directory and generate main day page
-        date_dir = output_dir / current_date.isoformat()
-        date_dir.mkdir(exist_ok=True)
-        output_file = date_dir / "index.html"
-        render_day_html(current_date, ferries, services, timezone, template_dir, output_file)
+    # Skip dates whose inputs match the previous publish and whose pages are still on disk; compress is part of
+    # the digest so toggling it re-renders every date, writing or removing the compressed copies
+    manifest_path = output_dir / BUILD_MANIFEST
+    manifest = {} if force else load_build_manifest(manifest_path)
+    template_digest = templates_digest(template_dir)
+    digests = {
+        d.isoformat(): day_digest(day_schedule, template_digest, compress) for d, day_schedule in day_schedules.items()
+    }
+    pending = {
+        d: day_schedule
+        for d, day_schedule in day_schedules.items()
+        if manifest.get(d.isoformat()) != digests[d.isoformat()] or not date_pages_exist(output_dir, d, compress)
+    }
+    logger.info(
+        f"Rendering {len(pending)} of {len(day_schedules)} dates ({len(day_schedules) - len(pending)} unchanged)"
+    )
 
-        logger.debug(f"Generated: {output_file}")
-        current_date += timedelta(days=1)
+    # Generate main, arrivals and departures pages for each date. Jinja rendering is CPU-bound
+    # Python, so use processes rather than threads to get past the GIL.
+    generation_time = generation_timestamp()
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(pending) <= 1:
+        for current_date, day_schedule in pending.items():
+            render_date_pages(current_date, day_schedule, template_dir, output_dir, generation_time, compress)
+    else:
+        jobs = min(jobs, len(pending))
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_render_worker, initargs=(template_dir,)
+        ) as executor:
+            # Consume the results so that any worker exception is raised here
+            list(
+                executor.map(
+                    render_date_pages,
+                    pending.keys(),
+                    pending.values(),
+                    repeat(template_dir),
+                    repeat(output_dir),
+                    repeat(generation_time),
+                    repeat(compress),
+                    chunksize=max(1, len(pending) // jobs),
+                )
+            )
+
+    # Record what was rendered only once every page has been written
+    updated_manifest = {**manifest, **digests}
+    if updated_manifest != manifest or not manifest_path.exists():
+        manifest_path.write_text(json.dumps(updated_manifest, indent=2, sort_keys=True), encoding="utf-8")
 
     # Generate index page
-    generate_index_html(template_dir, output_dir, date_range, "Chebeague Island Ferry Schedule")
-
-    # Generate filtered pages (arrivals/departures)
-    logger.info("Generating filtered pages...")
-    generate_filtered_pages(schedule_path, template_dir, output_dir, start_date, days, use_12h)
+    home_template = get_environment(template_dir).get_template("home.html")
+    generate_index_html(home_template, output_dir, list(day_schedules), f"{HOME_ISLAND} Ferry Schedule", compress)
 
     logger.info(f"Static site published to: {output_dir}")
     logger.info(f"  Main pages: {output_dir}/*/index.html")
@@ -159,6 +394,18 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--start-date", required=True, help="Start date (YYYY-MM-DD)")
     parser.add_argument("--days", type=int, default=30, help="Number of days to generate (default: 30)")
     parser.add_argument("--12h", action="store_true", help="Use 12-hour time format")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes for rendering, 0 for one per CPU (default: 1, render in-process)",
+    )
+    parser.add_argument("--force", action="store_true", help="Re-render every date, even if unchanged")
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="Also write gzip (and, with brotli installed, brotli) copies of each page for static serving",
+    )
     return parser.parse_args()
 
 
@@ -180,6 +427,9 @@ def main() -> None:
         start_date=start_date,
         days=args.days,
         use_12h=getattr(args, "12h", False),
+        jobs=args.jobs,
+        force=args.force,
+        compress=args.compress,
     )
 
 
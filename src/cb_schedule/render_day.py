@@ -4,34 +4,134 @@ Render a specific day's ferry schedule as HTML using Jinja2 templates.
 """
 
 import argparse
+import bisect
+import functools
+import hashlib
+import heapq
+import operator
 import sys
-from datetime import datetime, date
+from dataclasses import dataclass, field
+from datetime import datetime, date, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
-import yaml
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+from markupsafe import Markup
 
 # Configure logger
 from cb_schedule.logging_config import setup_logger
+from cb_schedule.cache_config import cache_dir, load_yaml_cached
 
 logger = setup_logger(__name__)
 
+# Jinja2 environments keyed by template directory, so templates are compiled once per process
+_environments: Dict[Path, Environment] = {}
+
+
+# Environment options that change the compiled templates. Jinja's bytecode cache only checks the
+# template source, so these also pick the cache directory: changing them can't load stale bytecode.
+_TEMPLATE_OPTIONS: Dict[str, Any] = {
+    # Every template is HTML, so escape unconditionally rather than deciding per template name
+    "autoescape": True,
+    # Drop the newline and indentation around block tags so they don't pad every page
+    "trim_blocks": True,
+    "lstrip_blocks": True,
+}
+
+
+def _bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    """On-disk cache of compiled templates, so later runs skip compiling them; None if unavailable."""
+    options_key = hashlib.blake2b(repr(sorted(_TEMPLATE_OPTIONS.items())).encode(), digest_size=8).hexdigest()
+    directory = cache_dir("jinja", options_key)
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.warning(f"Not caching compiled templates: {e}")
+        return None
+    return FileSystemBytecodeCache(str(directory))
+
+
+def get_environment(template_dir: Path) -> Environment:
+    """Return the Jinja2 environment for template_dir, creating it on first use."""
+    env = _environments.get(template_dir)
+    if env is None:
+        # Templates don't change during a run, so skip the per-lookup mtime check on every get_template
+        env = Environment(
+            loader=FileSystemLoader(template_dir),
+            auto_reload=False,
+            bytecode_cache=_bytecode_cache(),
+            **_TEMPLATE_OPTIONS,
+        )
+        env.globals["ferry_row"] = functools.partial(render_ferry_row, env)
+        _environments[template_dir] = env
+    return env
+
+
+@functools.lru_cache(maxsize=1024)
+def _render_ferry_row_cached(
+    env: Environment,
+    service: str,
+    service_url: str,
+    time: str,
+    start_location: Optional[str],
+    end_location: Optional[str],
+    show_direction_colors: bool,
+) -> Markup:
+    macro = env.get_template("ferry_row.html").module.ferry_row  # type: ignore[attr-defined]
+    ferry = {
+        "service": service,
+        "service_url": service_url,
+        "time": time,
+        "start_location": start_location,
+        "end_location": end_location,
+    }
+    return macro(ferry, show_direction_colors)
+
+
+def render_ferry_row(env: Environment, ferry: "FerryInfo", show_direction_colors: bool) -> Markup:
+    """
+    Render one schedule table row with the ferry_row.html macro.
+
+    The same departure appears on every day its schedule runs, so rendered rows are cached by the
+    fields the row shows and each distinct row is rendered once per process.
+    """
+    return _render_ferry_row_cached(
+        env,
+        ferry.service,
+        ferry.service_url,
+        ferry.time,
+        ferry.start_location,
+        ferry.end_location,
+        show_direction_colors,
+    )
+
 
 def load_schedule(schedule_path: Path) -> Dict[str, Any]:
-    """Load ferry schedule data from YAML file."""
-    if not schedule_path.exists():
-        raise FileNotFoundError(f"Schedule file not found: {schedule_path}")
+    """
+    Load ferry schedule data from YAML file.
 
-    with open(schedule_path, "r") as f:
-        return yaml.safe_load(f)
+    Parsed schedules are cached by path, modification time and size: in memory for this process,
+    and on disk (see cache_config.load_yaml_cached) so later runs skip the YAML parse while the file
+    is unchanged. Callers must not modify the returned data.
+    """
+    try:
+        stat = schedule_path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Schedule file not found: {schedule_path}") from None
+
+    return _load_schedule_cached(schedule_path.resolve(), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_schedule_cached(schedule_path: Path, mtime_ns: int, size: int) -> Dict[str, Any]:
+    return load_yaml_cached(schedule_path)
 
 
-def get_day_abbreviation(target_date: date) -> str:
-    """Convert date to day abbreviation (MO, TU, etc.)."""
-    day_map = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
-    return day_map[target_date.weekday()]
+# Indexed by date.weekday()
+DAY_ABBREVIATIONS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
 
 
+# Schedules reuse a small set of departure times, so each distinct time is converted once
+@functools.lru_cache(maxsize=1024)
 def format_time(time_str: str, use_12h: bool = False) -> str:
     """Format time string to 12H or 24H format."""
     if not time_str:
@@ -50,7 +150,10 @@ def format_time(time_str: str, use_12h: bool = False) -> str:
 
 
 def find_active_schedule(schedules: List[Dict[str, Any]], target_date: date) -> Optional[Dict[str, Any]]:
-    """Find the active schedule for the target date."""
+    """Find the active schedule for the target date; the first schedule in file order wins where they overlap.
+
+    ScheduleIndex.active_schedule answers the same question faster, and is tested against this scan.
+    """
     for schedule in schedules:
         start_date = schedule.get("start")
         end_date = schedule.get("end")
@@ -61,89 +164,226 @@ def find_active_schedule(schedules: List[Dict[str, Any]], target_date: date) ->
     return None
 
 
+class FerryInfo(NamedTuple):
+    """One departure as shown on a day page."""
+
+    service: str
+    service_url: str
+    time: Optional[str]
+    original_time: Optional[str]
+    # Minutes after midnight, for ordering departures
+    sort_key: int
+    start_location: Optional[str]
+    end_location: Optional[str]
+
+
+_departure_key = operator.attrgetter("sort_key")
+
+
+def _intern_location(location: Optional[str]) -> Optional[str]:
+    """Intern a terminal name so comparisons against other interned names short-circuit on identity."""
+    return sys.intern(location) if isinstance(location, str) else location
+
+
+def _minutes_after_midnight(time_str: Optional[str]) -> int:
+    """Integer sort key for an HH:MM time; unparsable times sort first, as "00:00"."""
+    hours, _, minutes = str(time_str).partition(":")
+    try:
+        return int(hours) * 60 + int(minutes)
+    except ValueError:
+        return 0
+
+
+@dataclass
+class ScheduleIndex:
+    """Schedule data prepared once for repeated per-day lookups."""
+
+    services: Dict[str, Dict[str, Any]]
+    timezone: str
+    # Per (schedule, use_12h): ferry info for each weekday, sorted by departure time
+    _weekday_ferries: Dict[Tuple[int, bool], List[List[FerryInfo]]] = field(default_factory=dict, repr=False)
+    # Per service: dates where the active schedule may change, and the schedule active from each one
+    _timelines: Dict[str, Tuple[List[date], List[Optional[Dict[str, Any]]]]] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_schedule_data(cls, schedule_data: Dict[str, Any]) -> "ScheduleIndex":
+        services = schedule_data.get("services", {})
+
+        # Use first service's timezone as primary
+        timezone = None
+        for service_data in services.values():
+            timezone = service_data.get("tzid", "UTC")
+            break
+
+        return cls(services=services, timezone=timezone or "UTC")
+
+    def active_schedule(self, service_name: str, target_date: date) -> Optional[Dict[str, Any]]:
+        """Same result as find_active_schedule for the service, via bisect over its schedule boundaries."""
+        timeline = self._timelines.get(service_name)
+        if timeline is None:
+            # (start, end, schedule) in file order, skipping schedules without a start as
+            # find_active_schedule does; a missing end means the schedule never ends
+            intervals = [
+                (schedule["start"], schedule.get("end") or date.max, schedule)
+                for schedule in self.services[service_name].get("schedules", [])
+                if schedule.get("start")
+            ]
+            # Which schedules cover a date only changes on a start date or the day after an end date
+            boundaries = set()
+            for start, end, _ in intervals:
+                boundaries.add(start)
+                if end < date.max:
+                    boundaries.add(end + timedelta(days=1))
+            starts = sorted(boundaries)
+            active = [next((s for lo, hi, s in intervals if lo <= day <= hi), None) for day in starts]
+            timeline = (starts, active)
+            self._timelines[service_name] = timeline
+
+        starts, active = timeline
+        i = bisect.bisect_right(starts, target_date)
+        # Before the earliest start date no schedule can be active
+        return active[i - 1] if i else None
+
+    def services_for(self, target_date: date) -> List[Dict[str, Any]]:
+        """Get the name and link of each service, as of its schedule active on the target date."""
+        services_info = []
+        for service_name, service_data in self.services.items():
+            active_schedule = self.active_schedule(service_name, target_date)
+            services_info.append(
+                {
+                    "name": f"{service_name.upper()} {active_schedule['name']}" if active_schedule else service_name,
+                    "url": active_schedule.get("url", "#") if active_schedule else service_data.get("url", "#"),
+                }
+            )
+        return services_info
+
+    def _ferries_by_weekday(self, service_name: str, schedule: Dict[str, Any], use_12h: bool) -> List[List[FerryInfo]]:
+        """Ferry info for a schedule bucketed by weekday (Monday first), built on first use."""
+        key = (id(schedule), use_12h)
+        buckets = self._weekday_ferries.get(key)
+        if buckets is None:
+            service_url = schedule.get("url", "#")
+            buckets: List[List[FerryInfo]] = [[] for _ in DAY_ABBREVIATIONS]
+            for ferry in schedule.get("ferries", []):
+                original_time = ferry.get("time")
+                ferry_info = FerryInfo(
+                    service=service_name,
+                    service_url=service_url,
+                    time=format_time(original_time, use_12h),
+                    original_time=original_time,
+                    sort_key=_minutes_after_midnight(original_time),
+                    start_location=_intern_location(ferry.get("from", None)),
+                    end_location=_intern_location(ferry.get("to", None)),
+                )
+                byday = ferry.get("byday", [])
+                for weekday, day_abbrev in enumerate(DAY_ABBREVIATIONS):
+                    if day_abbrev in byday:
+                        buckets[weekday].append(ferry_info)
+
+            for bucket in buckets:
+                bucket.sort(key=_departure_key)
+            self._weekday_ferries[key] = buckets
+        return buckets
+
+    def ferries_for(self, target_date: date, use_12h: bool = False) -> List[FerryInfo]:
+        """
+        Get all ferries running on the target date from all services, sorted by departure time.
+
+        The FerryInfo tuples are shared between dates with the same schedule and weekday.
+        """
+        weekday = target_date.weekday()
+        day_buckets = []
+
+        for service_name, service_data in self.services.items():
+            active_schedule = self.active_schedule(service_name, target_date)
+            if active_schedule:
+                day_buckets.append(self._ferries_by_weekday(service_name, active_schedule, use_12h)[weekday])
+
+        # Each bucket is already sorted; merge keeps service order for equal times, like a stable sort
+        return list(heapq.merge(*day_buckets, key=_departure_key))
+
+
 def get_ferries_for_day(
     schedule_data: Dict[str, Any], target_date: date, use_12h: bool = False
-) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], str]:
+) -> Tuple[List[FerryInfo], List[Dict[str, Any]], str]:
     """Get all ferries running on the target date from all services."""
-    day_abbrev = get_day_abbreviation(target_date)
-    all_ferries = []
-    services_info = []
-    primary_timezone = None
+    index = ScheduleIndex.from_schedule_data(schedule_data)
+    return index.ferries_for(target_date, use_12h), index.services_for(target_date), index.timezone
 
-    services = schedule_data.get("services", {})
 
-    for service_name, service_data in services.items():
-        # Use first service's timezone as primary
-        if primary_timezone is None:
-            primary_timezone = service_data.get("tzid", "UTC")
-
-        schedules = service_data.get("schedules", [])
-        active_schedule = find_active_schedule(schedules, target_date)
-        # Collect service info for links
-        services_info.append(
-            {
-                "name": f"{service_name.upper()} {active_schedule['name']}" if active_schedule else service_name,
-                "url": active_schedule.get("url", "#") if active_schedule else service_data.get("url", "#"),
-            }
-        )
+class DayLabels(NamedTuple):
+    """Display strings for a date, shared by all of its pages."""
 
-        if active_schedule:
-            service_url = active_schedule.get("url", "#")
-            ferries = active_schedule.get("ferries", [])
-            for ferry in ferries:
-                byday = ferry.get("byday", [])
-                if day_abbrev in byday:
-                    original_time = ferry.get("time")
-                    ferry_info = {
-                        "service": service_name,
-                        "service_url": service_url,
-                        "time": format_time(original_time, use_12h),
-                        "original_time": original_time,  # Keep for sorting
-                        "start_location": ferry.get("from", None),
-                        "end_location": ferry.get("to", None),
-                    }
-                    all_ferries.append(ferry_info)
-
-    # Sort ferries by original 24H time
-    all_ferries.sort(key=lambda x: x.get("original_time", "00:00"))
-    return all_ferries, services_info, primary_timezone or "UTC"
+    date_formatted: str
+    day_name: str
 
 
-def render_day_html(
-    target_date: date,
-    ferries: List[Dict[str, Any]],
-    services: List[Dict[str, Any]],
-    timezone: str,
-    template_dir: Path,
-    output_path: Path,
-    show_direction_colors: bool = True,
-) -> None:
-    """Render the day's schedule as HTML."""
+@functools.lru_cache(maxsize=512)
+def day_labels(target_date: date) -> DayLabels:
+    """Format the date headings once per date rather than once per rendered page."""
+    return DayLabels(date_formatted=target_date.strftime("%A, %B %d, %Y"), day_name=target_date.strftime("%A"))
+
 
-    # Set up Jinja2 environment
-    env = Environment(loader=FileSystemLoader(template_dir), autoescape=select_autoescape(["html", "xml"]))
+def generation_timestamp() -> str:
+    """Timestamp shown in page footers."""
+    return datetime.now().strftime("%Y-%m-%d %H:%M")
 
-    # Load template
-    template = env.get_template("day.html")
 
-    # Prepare template data
-    template_data = {
+def _day_template_data(
+    target_date: date,
+    ferries: List[FerryInfo],
+    services: List[Dict[str, Any]],
+    timezone: str,
+    show_direction_colors: bool,
+    generation_time: Optional[str],
+) -> Dict[str, Any]:
+    labels = day_labels(target_date)
+    return {
         "date": target_date,
-        "date_formatted": target_date.strftime("%A, %B %d, %Y"),
+        "date_formatted": labels.date_formatted,
         "ferries": ferries,
         "services": services,
         "timezone": timezone,
-        "day_name": target_date.strftime("%A"),
-        "generation_time": datetime.now().strftime("%Y-%m-%d %H:%M"),
+        "day_name": labels.day_name,
+        "generation_time": generation_time or generation_timestamp(),
         "show_direction_colors": show_direction_colors,
     }
 
-    # Render HTML
-    html_content = template.render(**template_data)
 
-    # Write to file
-    with open(output_path, "w") as f:
-        f.write(html_content)
+def render_day_html(
+    target_date: date,
+    ferries: List[FerryInfo],
+    services: List[Dict[str, Any]],
+    timezone: str,
+    template: Template,
+    show_direction_colors: bool = True,
+    generation_time: Optional[str] = None,
+) -> str:
+    """
+    Render the day's schedule as HTML using the compiled day.html template.
+
+    Pass generation_time to stamp a batch of pages identically; it defaults to the current time.
+    """
+    return template.render(
+        **_day_template_data(target_date, ferries, services, timezone, show_direction_colors, generation_time)
+    )
+
+
+def write_day_html(
+    output_path: Path,
+    target_date: date,
+    ferries: List[FerryInfo],
+    services: List[Dict[str, Any]],
+    timezone: str,
+    template: Template,
+    show_direction_colors: bool = True,
+    generation_time: Optional[str] = None,
+) -> None:
+    """Render the day's schedule like render_day_html, streaming it into output_path as UTF-8."""
+    # dump() writes each rendered chunk to a buffered file instead of joining the whole page first
+    template.stream(
+        **_day_template_data(target_date, ferries, services, timezone, show_direction_colors, generation_time)
+    ).dump(str(output_path), encoding="utf-8")
 
 
 def parse_args() -> argparse.Namespace:
@@ -179,10 +419,10 @@ def main() -> None:
     ferries, services, timezone = get_ferries_for_day(schedule_data, target_date, getattr(args, "12h", False))
 
     # Render HTML
-    template_dir = Path(args.template_dir)
+    template = get_environment(Path(args.template_dir)).get_template("day.html")
     output_path = Path(args.output)
 
-    render_day_html(target_date, ferries, services, timezone, template_dir, output_path)
+    write_day_html(output_path, target_date, ferries, services, timezone, template)
     logger.info(f"Generated HTML for {target_date} -> {output_path}")
 
 
@@ -3,10 +3,12 @@ Scrape Casco Bay Lines ferry schedule and convert to YAML format.
 """
 
 import argparse
+import bisect
+import functools
 import re
 from datetime import date
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 import httpx
 from selectolax.parser import HTMLParser
 import yaml
@@ -14,18 +16,68 @@ from dateutil import parser as dateparse
 
 # Configure logger
 from cb_schedule.logging_config import setup_logger
+from cb_schedule.yaml_config import SafeDumper, SafeLoader
 
 logger = setup_logger(__name__)
 
+# Patterns used when parsing the schedule page
+_EFFECTIVE_LABEL_RE = re.compile(r"^\s*Effective", re.I)
+_EFFECTIVE_TEXT_RE = re.compile(r"Effective:?\s*(.+)", re.I)
+_DASH_RE = re.compile(r"[\u2012\u2013\u2014\u2015-]+")
+_RANGE_SPLIT_RE = re.compile(r"(.+?)\s*-\s*(.+)$")
+_TIME_RE = re.compile(r"(\d+):(\d+)$")
+_DATE_RE = re.compile(r"([A-Za-z]+)\.?\s+(\d{1,2})(?:,?\s*(\d{4}))?$")
+
+# Service days are shared immutable tuples rather than a fresh list per parsed time
+_ALL_DAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+_WEEKDAYS_NO_FRI = ("MO", "TU", "WE", "TH", "SA", "SU")
+_FRIDAY_ONLY = ("FR",)
+
+# Day restriction suffixes on schedule times, e.g. "8:30 XF" (except Friday) or "9:15 FO" (Friday only)
+_DAY_MARKERS = {"XF": _WEEKDAYS_NO_FRI, "FO": _FRIDAY_ONLY}
+
+# Month names and abbreviations as they appear on the schedule pages
+_MONTHS = {
+    name: number
+    for number, names in enumerate(
+        [
+            ("january", "jan"),
+            ("february", "feb"),
+            ("march", "mar"),
+            ("april", "apr"),
+            ("may",),
+            ("june", "jun"),
+            ("july", "jul"),
+            ("august", "aug"),
+            ("september", "sep", "sept"),
+            ("october", "oct"),
+            ("november", "nov"),
+            ("december", "dec"),
+        ],
+        1,
+    )
+    for name in names
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _get_client() -> httpx.Client:
+    """Return the shared HTTP client, so repeated fetches reuse its pooled connections."""
+    return httpx.Client(timeout=10.0, headers={"User-Agent": "cb_schedule/1.0"})
+
 
 def get_sched(url: str) -> str:
-    response = httpx.get(url)
+    response = _get_client().get(url)
     response.raise_for_status()
     return response.text
 
 
-def parse_cbl_schedule(url: str, html: str) -> Dict[str, Any]:
-    """Scrape the Chebeague Island summer schedule from Casco Bay Lines website."""
+def parse_cbl_schedule(url: str, html: str | bytes) -> Dict[str, Any]:
+    """
+    Scrape the Chebeague Island summer schedule from Casco Bay Lines website.
+
+    html may be undecoded page bytes, which the parser decodes itself without an intermediate str.
+    """
 
     parser = HTMLParser(html)
 
@@ -39,11 +91,18 @@ def parse_cbl_schedule(url: str, html: str) -> Dict[str, Any]:
     is_am = True
     ferries = []
     for row in rows:
-        am_pm = row.css_first("td.column-1")
+        # Match the row's cells once and index them by class. Cells can't be indexed by position
+        # because the AM/PM column-1 cell spans several rows and only appears on the first of them.
+        cells = {}
+        for td in row.css("td"):
+            for cls in (td.attributes.get("class") or "").split():
+                cells[cls] = td
+
+        am_pm = cells.get("column-1")
         if am_pm and am_pm.text().strip().lower() == "pm":
             is_am = False
 
-        portland_cell = row.css_first("td.column-2")
+        portland_cell = cells.get("column-2")
         if not portland_cell:
             continue
         leave_portland_time, leave_portland_days = parse_time_to_24h(portland_cell.text(), is_pm=not is_am)
@@ -55,7 +114,7 @@ def parse_cbl_schedule(url: str, html: str) -> Dict[str, Any]:
                 "days": leave_portland_days,
             }
         )
-        chebeague_cell = row.css_first("td.column-3")
+        chebeague_cell = cells.get("column-3")
         if not chebeague_cell:
             continue
         leave_chebeague_time, leave_chebeague_days = parse_time_to_24h(chebeague_cell.text(), is_pm=not is_am)
@@ -111,12 +170,32 @@ def correct_malformed_year(parsed_date: date, reference_date: date | None = None
     )
 
 
+def parse_date(text: str) -> date:
+    """
+    Parse a date such as 'June 21, 2025' or 'Sep 2'.
+
+    Dates in that form are parsed directly; a missing year defaults to the current year, as with
+    dateutil. Anything else, including truncated years like 'October 13, 202', falls back to dateutil.
+    """
+    m = _DATE_RE.match(text)
+    if m:
+        month = _MONTHS.get(m.group(1).lower())
+        if month:
+            year = int(m.group(3)) if m.group(3) else date.today().year
+            try:
+                return date(year, month, int(m.group(2)))
+            except ValueError:
+                pass
+
+    return dateparse.parse(text).date()
+
+
 def parse_effective_dates(parser: HTMLParser) -> Tuple[date, date]:
     # Find the "Effective:" label - look for strong tags and check their text
     strong_tags = parser.css("strong")
     eff = None
     for strong in strong_tags:
-        if re.match(r"^\s*Effective", strong.text(), re.I):
+        if _EFFECTIVE_LABEL_RE.match(strong.text()):
             eff = strong
             break
 
@@ -131,17 +210,17 @@ def parse_effective_dates(parser: HTMLParser) -> Tuple[date, date]:
     # Get all text from the parent and extract the date range
     full_text = parent.text(strip=True)
     # Remove the "Effective:" part and get what follows
-    effective_match = re.search(r"Effective:?\s*(.+)", full_text, re.I)
+    effective_match = _EFFECTIVE_TEXT_RE.search(full_text)
     if not effective_match:
         raise ValueError(f"Could not extract date range from: {full_text}")
 
     range_text = effective_match.group(1).strip()
 
     # Normalize any dash variant to a single hyphen
-    range_text = re.sub(r"[\u2012\u2013\u2014\u2015-]+", "-", range_text)
+    range_text = _DASH_RE.sub("-", range_text)
 
     # Split into start/end
-    m = re.search(r"(.+?)\s*-\s*(.+)$", range_text)
+    m = _RANGE_SPLIT_RE.search(range_text)
     if not m:
         raise ValueError(f"Could not parse date range: {range_text!r}")
 
@@ -149,8 +228,8 @@ def parse_effective_dates(parser: HTMLParser) -> Tuple[date, date]:
     end_text = m.group(2).strip()
 
     # Parse the dates
-    start = dateparse.parse(start_text).date()
-    end = dateparse.parse(end_text).date()
+    start = parse_date(start_text)
+    end = parse_date(end_text)
 
     # Correct any malformed years
     start = correct_malformed_year(start, raw_text=start_text)
@@ -159,43 +238,33 @@ def parse_effective_dates(parser: HTMLParser) -> Tuple[date, date]:
     return start, end
 
 
-def parse_time_to_24h(time_str: Optional[str], is_pm: bool = False) -> Tuple[str, List[str]]:
+def parse_time_to_24h(time_str: Optional[str], is_pm: bool = False) -> Tuple[str, Tuple[str, ...]]:
     """Parse time string and convert to 24H format."""
     if not time_str or not time_str.strip():
         raise ValueError("Empty time string")
 
-    all_days = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
-
-    if time_str.endswith("XF"):
-        days = [d for d in all_days if d != "FR"]
-    elif time_str.endswith("XF"):
-        days = ["FR"]
-    else:
-        days = all_days
-    time_str = time_str.strip().split(" ")[0]
+    time_str = time_str.strip()
+    days = _DAY_MARKERS.get(time_str[-2:], _ALL_DAYS)
+    time_str = time_str.split(" ")[0]
 
-    if ":" not in time_str:
+    time_match = _TIME_RE.match(time_str)
+    if not time_match:
         raise ValueError(f"Invalid time format: {time_str}")
 
-    try:
-        hour_str, minute_str = time_str.split(":")
-        hour = int(hour_str)
-        minute = int(minute_str)
+    hour = int(time_match.group(1))
+    minute = int(time_match.group(2))
 
-        # Handle 12-hour to 24-hour conversion based on context
-        if is_pm and hour != 12:
-            hour += 12
-        elif not is_pm and hour == 12:
-            hour = 0  # 12:xx AM becomes 00:xx
+    # Handle 12-hour to 24-hour conversion based on context
+    if is_pm and hour != 12:
+        hour += 12
+    elif not is_pm and hour == 12:
+        hour = 0  # 12:xx AM becomes 00:xx
 
-        # Validate time components
-        if not (0 <= hour <= 23 and 0 <= minute <= 59):
-            raise ValueError(f"Invalid time values: {hour}:{minute}")
+    # Validate time components
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        raise ValueError(f"Could not parse time '{time_str}': Invalid time values: {hour}:{minute}")
 
-        return f"{hour:02d}:{minute:02d}", days
-
-    except (ValueError, IndexError) as e:
-        raise ValueError(f"Could not parse time '{time_str}': {e}") from e
+    return f"{hour:02d}:{minute:02d}", days
 
 
 def convert_to_yaml_schedule(
@@ -206,7 +275,7 @@ def convert_to_yaml_schedule(
     # Load existing YAML
     if schedule_path.exists():
         with open(schedule_path, "r") as f:
-            data = yaml.safe_load(f) or {}
+            data = yaml.load(f, Loader=SafeLoader) or {}
     else:
         data = {}
 
@@ -229,23 +298,21 @@ def convert_to_yaml_schedule(
 
     # Process all ferry departures
     for ferry in schedule_data["ferries"]:
-        ferry_entry = {"time": ferry["time"], "from": ferry["from"], "to": ferry["to"], "byday": ferry["days"]}
+        ferry_entry = {"time": ferry["time"], "from": ferry["from"], "to": ferry["to"], "byday": list(ferry["days"])}
         new_schedule["ferries"].append(ferry_entry)
 
-    # Remove existing schedule with same start date for cbl
-    data["services"]["cbl"]["schedules"] = [
-        s for s in data["services"]["cbl"]["schedules"] if s.get("start") != schedule_data["start"]
-    ]
-
-    # Add new schedule
-    data["services"]["cbl"]["schedules"].append(new_schedule)
-
-    # Sort schedules by start date
-    data["services"]["cbl"]["schedules"].sort(key=lambda x: x.get("start", date.min))
+    # Replace any existing schedule with the same start date, otherwise insert in start date order
+    schedules = data["services"]["cbl"]["schedules"]
+    for idx, existing in enumerate(schedules):
+        if existing.get("start") == schedule_data["start"]:
+            schedules[idx] = new_schedule
+            break
+    else:
+        bisect.insort(schedules, new_schedule, key=lambda x: x.get("start", date.min))
 
     # Write back to file
     with open(schedule_path, "w") as f:
-        yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+        yaml.dump(data, f, Dumper=SafeDumper, default_flow_style=False, sort_keys=False)
 
 
 def parse_args() -> argparse.Namespace:
@@ -260,7 +327,7 @@ def main() -> None:
     args = parse_args()
 
     if args.path and args.path.exists():
-        html = args.path.read_text()
+        html: str | bytes = args.path.read_bytes()
     else:
         html = get_sched(args.url)
         args.path.write_text(html)
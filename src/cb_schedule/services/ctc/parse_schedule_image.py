@@ -3,20 +3,47 @@ Extract ferry schedule from image using OCR and convert to YAML format.
 """
 
 import argparse
+import hashlib
+import json
+import os
+import re
+import stat
 import sys
 import csv
+import tempfile
 from datetime import datetime, date
 from pathlib import Path
-from typing import Any, List, Optional
-from img2table.document import Image
-from img2table.ocr import PaddleOCR
+from typing import Any, Dict, List, Optional, Set
 import yaml
+from yaml.resolver import Resolver
 
 # Configure logger
+from cb_schedule.cache_config import cache_dir, load_yaml_cached, store_yaml_cache
 from cb_schedule.logging_config import setup_logger
+from cb_schedule.yaml_config import SafeDumper
 
 logger = setup_logger(__name__)
 
+# orjson reads and writes the OCR cache several times faster than json; use it when installed
+try:
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+    _json_loads = json.loads
+
+# Inference backends selectable from the CLI. "hpi" lets PaddleOCR pick the fastest installed
+# engine (ONNX Runtime, OpenVINO or TensorRT) and needs the high-performance inference plugin.
+OCR_BACKENDS = ("paddle", "hpi", "tensorrt")
+
+
+# Whitespace OCR leaves inside time cells, e.g. "8:15 PM\n"
+_TIME_WHITESPACE = str.maketrans("", "", " \t\r\n")
+_TIME_RE = re.compile(r"(\d{1,2}):(\d{1,2})(AM|PM)?")
+_CHECKMARKS = frozenset(c.lower() for c in ("✓", "√", "v", ">", "<", "→"))
+
 
 def parse_time_to_24h(time_str: str) -> str:
     """Parse time string like '8:15PM' and convert to 24H format."""
@@ -24,27 +51,24 @@ def parse_time_to_24h(time_str: str) -> str:
         raise ValueError("Empty time string")
 
     # Clean up the time string
-    time_str = time_str.strip().replace("\n", " ").replace(" ", "").upper()
+    time_str = time_str.translate(_TIME_WHITESPACE).upper()
 
     # Handle special case: NOON
     if time_str == "NOON":
         return "12:00"
 
-    # Check if it's already in 24-hour format (HH:MM)
-    if ":" in time_str and not any(c in time_str for c in ["AM", "PM"]):
-        try:
-            # Validate it's a valid time
-            datetime.strptime(time_str, "%H:%M")
-            return time_str
-        except ValueError:
-            pass
+    match = _TIME_RE.fullmatch(time_str)
+    if match:
+        hour, minute, meridiem = int(match[1]), int(match[2]), match[3]
+        if minute < 60:
+            # Already in 24-hour format (HH:MM)
+            if meridiem is None and hour < 24:
+                return time_str
+            # 12-hour format
+            if meridiem and 1 <= hour <= 12:
+                return f"{hour % 12 + (12 if meridiem == 'PM' else 0):02d}:{minute:02d}"
 
-    # Parse 12-hour format and convert to 24-hour
-    try:
-        dt = datetime.strptime(time_str, "%I:%M%p")
-        return dt.strftime("%H:%M")
-    except ValueError as e:
-        raise ValueError(f"Could not parse time '{time_str}': {e}")
+    raise ValueError(f"Could not parse time '{time_str}': expected H:MM, HH:MM or H:MMAM/PM")
 
 
 def is_service_available(cell_content: Any) -> bool:
@@ -65,47 +89,276 @@ def is_service_available(cell_content: Any) -> bool:
         return False
 
     # Checkmark symbols indicate True
-    checkmarks = ["✓", "√", "v", ">", "<", "→"]
-    if content in [c.lower() for c in checkmarks]:
+    if content in _CHECKMARKS:
         return True
 
     raise ValueError(f"Failed to parse {cell_content}")
 
 
-def parse_schedule_image(image_path: Path) -> List[List[str]]:
-    """Extract table and output as CSV with 24H time and True/False values."""
+def ocr_options(backend: str = "paddle", fp16: bool = False) -> Dict[str, Any]:
+    """Build PaddleOCR constructor options for the given inference backend."""
+    if backend not in OCR_BACKENDS:
+        raise ValueError(f"Unknown OCR backend '{backend}', expected one of {', '.join(OCR_BACKENDS)}")
+
+    options: Dict[str, Any] = {
+        "enable_mkldnn": True,
+        "cpu_threads": os.cpu_count() or 1,
+        "precision": "fp16" if fp16 else "fp32",
+        # Schedule tables are small: batching text lines only makes Paddle reserve larger arenas
+        "text_recognition_batch_size": 1,
+        "textline_orientation_batch_size": 1,
+    }
+    if backend == "hpi":
+        options["enable_hpi"] = True
+    elif backend == "tensorrt":
+        options["use_tensorrt"] = True
+
+    return options
+
 
-    # Initialize OCR
-    ocr = PaddleOCR(lang="en")
+def _cell_str(cell: Any) -> str:
+    """Text of an extracted table cell; cells are normally img2table TableCell objects."""
+    try:
+        return cell.value or ""
+    except AttributeError:
+        if cell is None:
+            return ""
+        return cell if isinstance(cell, str) else str(cell)
+
+
+class SchedulePageParser:
+    """Extract tables from schedule images, loading the OCR models once for all of them."""
+
+    def __init__(self, backend: str = "paddle", fp16: bool = False, use_cache: bool = True):
+        self.options = ocr_options(backend, fp16)
+        self.backend = backend
+        self.use_cache = use_cache
+        self._ocr: Any = None
+
+    @property
+    def ocr(self) -> Any:
+        """PaddleOCR instance, built on first use so cached and CSV-only runs never load the models."""
+        if self._ocr is None:
+            # Imported here so CSV-only runs don't load Paddle and OpenCV
+            from img2table.ocr import PaddleOCR
+
+            self._ocr = PaddleOCR(lang="en", kw=dict(self.options))
+        return self._ocr
+
+    def warmup(self) -> None:
+        """Run OCR once on a blank image so model loading and backend setup aren't billed to the first schedule."""
+        import cv2
+        import numpy as np
+        from img2table.document import Image
+
+        _, blank_png = cv2.imencode(".png", np.full((32, 32, 3), 255, dtype=np.uint8))
+        try:
+            # OCRInstance.of is the hook extract_tables itself calls (img2table 1.4 through 2.0); extract_tables
+            # can't be used here because it only runs OCR once it has found a table
+            self.ocr.of(document=Image(src=blank_png.tobytes()))
+        except Exception as e:
+            logger.warning(f"OCR warmup failed: {e}")
+
+    def parse(self, image_path: Path) -> List[List[str]]:
+        """Return the table rows for an image, reusing the stored OCR result for identical contents."""
+        # Read once: the same bytes are hashed for the cache key and handed to img2table
+        image_bytes = image_path.read_bytes()
+        if not self.use_cache:
+            return self.extract(image_bytes)
+
+        # Backends and precisions can read the same image differently, so each gets its own entry
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        cache_path = cache_dir("ocr") / f"{digest}-{self.backend}-{self.options['precision']}.json"
+
+        try:
+            rows = _json_loads(cache_path.read_bytes())
+            logger.info(f"Using cached OCR result: {cache_path}")
+            return rows
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable OCR cache {cache_path}: {e}")
+
+        rows = self.extract(image_bytes)
+
+        # The cache is an optimization; never lose an OCR result because it can't be stored
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(_json_dumps(rows))
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            logger.warning(f"Could not write OCR cache {cache_path}: {e}")
 
-    image = Image(src=str(image_path))
+        return rows
 
-    extracted_tables = image.extract_tables(ocr=ocr, implicit_rows=False, borderless_tables=False)
+    def extract(self, image_bytes: bytes) -> List[List[str]]:
+        """Extract table and output as CSV with 24H time and True/False values."""
+        from img2table.document import Image
 
-    if not extracted_tables:
-        raise ValueError("No tables found in image")
+        image = Image(src=image_bytes)
 
-    if len(extracted_tables) > 1:
-        raise ValueError("Detected multiple tables")
+        extracted_tables = image.extract_tables(ocr=self.ocr, implicit_rows=False, borderless_tables=False)
 
-    table = extracted_tables[0]
+        if not extracted_tables:
+            raise ValueError("No tables found in image")
 
-    # Get table data
-    rows = []
-    for _, row in table.content.items():
-        row_values = []
-        for cell in row:
-            if cell is None:
-                row_values.append("")
-            elif hasattr(cell, "value"):
-                row_values.append(cell.value if cell.value else "")
-            elif isinstance(cell, str):
-                row_values.append(cell)
-            else:
-                row_values.append(str(cell))
-        rows.append(row_values)
+        if len(extracted_tables) > 1:
+            raise ValueError("Detected multiple tables")
+
+        table = extracted_tables[0]
+
+        # Get table data
+        return [[_cell_str(cell) for cell in row] for row in table.content.values()]
+
+
+def parse_schedule_image(image_path: Path, backend: str = "paddle", fp16: bool = False) -> List[List[str]]:
+    """Extract table and output as CSV with 24H time and True/False values."""
+    return SchedulePageParser(backend, fp16, use_cache=False).parse(image_path)
+
+
+# Strings that yaml.dump would not write as plain scalars in block context
+_PLAIN_UNSAFE_RE = re.compile(r"""^[-?:](?:\s|$)|^[#,\[\]{}&*!|>'"%@`]|:(?:\s|$)|\s#|^\s|\s$|^---|^\.\.\.""")
+# Strings yaml.dump would double-quote, escape or fold; left to yaml.dump itself
+_NOT_EMITTABLE_RE = re.compile(r"[^\x20-\x7e]")
+_RESOLVER = Resolver()
+_STR_TAG = "tag:yaml.org,2002:str"
+# yaml.dump's default line width; longer lines with spaces in them get folded
+_YAML_WIDTH = 80
+# yaml.dump writes keys this long or longer in the explicit "? key" form
+_MAX_SIMPLE_KEY = 128
+
+
+def _yaml_scalar(value: Any, column: int) -> str:
+    """Format a scalar the way yaml.dump does, raising ValueError for anything outside the schema."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return value.isoformat()
+    if not isinstance(value, str):
+        raise ValueError(f"Cannot emit {type(value).__name__} value {value!r}")
+
+    if _NOT_EMITTABLE_RE.search(value) or (" " in value and column + len(value) > _YAML_WIDTH):
+        raise ValueError(f"Cannot emit string {value!r}")
+    if (
+        value
+        and not _PLAIN_UNSAFE_RE.search(value)
+        and _RESOLVER.resolve(yaml.ScalarNode, value, (True, False)) == _STR_TAG
+    ):
+        return value
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _find_anchors(node: Any, seen: Set[int], anchors: Dict[int, str]) -> None:
+    """Name shared lists/dicts in traversal order, matching yaml.dump's &idNNN anchors."""
+    if not isinstance(node, (dict, list)):
+        return
+    if id(node) in seen:
+        if id(node) not in anchors:
+            anchors[id(node)] = f"id{len(anchors) + 1:03d}"
+        return
+    seen.add(id(node))
+    for child in node.values() if isinstance(node, dict) else node:
+        _find_anchors(child, seen, anchors)
+
+
+def _dump_schedule_yaml(data: Dict[str, Any]) -> str:
+    """
+    Emit schedule data with the same layout as yaml.dump(default_flow_style=False, sort_keys=False).
+
+    Only covers what schedule files contain: nested dicts and lists of strings, dates, ints, bools and
+    None. Raises ValueError for anything else so the caller can fall back to yaml.dump.
+    """
+    anchors: Dict[int, str] = {}
+    _find_anchors(data, set(), anchors)
+    emitted: Set[int] = set()
+    out: List[str] = []
+
+    def write_value(value: Any, column: int, after_dash: bool, scalar_column: int) -> None:
+        # `column` is the key column after "key:", or the dash column after "- "; `scalar_column`
+        # is where a scalar value would start, which decides whether yaml.dump would fold it
+        sep = "" if after_dash else " "
+        if not isinstance(value, (dict, list)):
+            out.append(f"{sep}{_yaml_scalar(value, scalar_column)}\n")
+            return
+
+        anchor = anchors.get(id(value))
+        if anchor and id(value) in emitted:
+            out.append(f"{sep}*{anchor}\n")
+            return
+        emitted.add(id(value))
+        anchor_text = f"{sep}&{anchor}" if anchor else ""
+
+        if not value:
+            empty = "{}" if isinstance(value, dict) else "[]"
+            out.append(f"{anchor_text} {empty}\n" if anchor else f"{sep}{empty}\n")
+            return
+
+        # A collection can start on the dash's line unless an anchor takes that spot
+        inline = after_dash and not anchor
+        if not inline:
+            out.append(f"{anchor_text}\n")
+        if isinstance(value, dict):
+            write_mapping(value, column + 2, inline)
+        else:
+            # Sequences under a mapping key are not indented, matching yaml.dump
+            write_sequence(value, column + 2 if after_dash else column, inline)
+
+    def write_mapping(mapping: Dict[Any, Any], column: int, inline: bool) -> None:
+        for i, (key, value) in enumerate(mapping.items()):
+            if i or not inline:
+                out.append(" " * column)
+            key_text = _yaml_scalar(key, column)
+            if len(str(key)) >= _MAX_SIMPLE_KEY:
+                raise ValueError(f"Cannot emit long key {key!r}")
+            out.append(f"{key_text}:")
+            write_value(value, column, after_dash=False, scalar_column=column + len(key_text) + 2)
+
+    def write_sequence(items: List[Any], column: int, inline: bool) -> None:
+        for i, item in enumerate(items):
+            if i or not inline:
+                out.append(" " * column)
+            out.append("- ")
+            write_value(item, column, after_dash=True, scalar_column=column + 2)
+
+    if not data:
+        return "{}\n"
+    write_mapping(data, 0, inline=False)
+    return "".join(out)
+
+
+def write_text_atomic(path: Path, text: str) -> None:
+    """Replace a file's contents so readers never see it partially written, keeping its permissions."""
+    tmp = tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False
+    )
+    tmp_path = Path(tmp.name)
+    try:
+        with tmp:
+            tmp.write(text)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+
+        # NamedTemporaryFile creates files as 0600; keep the mode the file already had, or give a new
+        # file the mode open(path, "w") would have (0666 less the umask, which can only be read by setting it)
+        try:
+            mode = stat.S_IMODE(path.stat().st_mode)
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp_path, mode)
 
-    return rows
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
 
 
 def write_yaml_schedule(
@@ -121,10 +374,9 @@ def write_yaml_schedule(
         raise ValueError("No data found in table")
 
     # Load existing YAML
-    if schedule_path.exists():
-        with open(schedule_path, "r") as f:
-            data = yaml.safe_load(f) or {}
-    else:
+    try:
+        data = load_yaml_cached(schedule_path) or {}
+    except FileNotFoundError:
         data = {}
 
     # Ensure services.ctc structure exists
@@ -164,15 +416,14 @@ def write_yaml_schedule(
 
             # Get service days from columns 3-9 (7 days)
             service_days = []
-            for day_idx, day_abbrev in enumerate(day_map):
-                if day_idx + 3 < len(row):
-                    try:
-                        if is_service_available(row[day_idx + 3]):
-                            service_days.append(day_abbrev)
-                    except ValueError as service_error:
-                        logger.warning(
-                            f"Could not parse service availability in row {i}, column {day_idx + 3}: '{row[day_idx + 3]}' - {service_error}"
-                        )
+            for column, (day_abbrev, cell) in enumerate(zip(day_map, row[3:10]), 3):
+                try:
+                    if is_service_available(cell):
+                        service_days.append(day_abbrev)
+                except ValueError as service_error:
+                    logger.warning(
+                        f"Could not parse service availability in row {i}, column {column}: '{cell}' - {service_error}"
+                    )
 
             leave_chebeague = {
                 "time": leave_chebeague_time,
@@ -195,20 +446,30 @@ def write_yaml_schedule(
             logger.error(f"Skipping row {i} (time: '{row[1] if len(row) > 1 else 'N/A'}'): {e}")
             continue
 
-    # Remove existing schedule with same start date
-    data["services"]["ctc"]["schedules"] = [
-        s for s in data["services"]["ctc"]["schedules"] if s.get("start") != start_date
-    ]
+    # Group schedules by start date; the new schedule replaces any with the same start
+    by_start: Dict[date, List[Dict[str, Any]]] = {}
+    for schedule in data["services"]["ctc"]["schedules"]:
+        by_start.setdefault(schedule.get("start", date.min), []).append(schedule)
 
-    # Add new schedule
-    data["services"]["ctc"]["schedules"].append(new_schedule)
+    # Leave the file (and its mtime) alone when re-running with the same input
+    if by_start.get(start_date) == [new_schedule]:
+        logger.info(f"Schedule '{name}' starting {start_date} is unchanged; not rewriting {schedule_path}")
+        return
 
-    # Sort schedules by start date
-    data["services"]["ctc"]["schedules"].sort(key=lambda x: x.get("start", date.min))
+    by_start[start_date] = [new_schedule]
+
+    # Write schedules back sorted by start date
+    data["services"]["ctc"]["schedules"] = [s for start in sorted(by_start) for s in by_start[start]]
 
     # Write back to file
-    with open(schedule_path, "w") as f:
-        yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+    try:
+        text = _dump_schedule_yaml(data)
+    except ValueError as e:
+        logger.debug(f"Falling back to yaml.dump: {e}")
+        text = yaml.dump(data, Dumper=SafeDumper, default_flow_style=False, sort_keys=False)
+
+    write_text_atomic(schedule_path, text)
+    store_yaml_cache(schedule_path, data)
 
 
 def read_csv(csv_path: Path) -> List[List[str]]:
@@ -232,47 +493,69 @@ def write_csv(table: List[List[str]], output_path: Optional[Path] = None) -> Non
     if not table:
         raise ValueError("No data found in table")
 
-    if output_path:
-        output_file = open(output_path, "w", newline="")
-        writer = csv.writer(output_file)
-    else:
-        output_file = None
-        writer = csv.writer(sys.stdout)
-
-    try:
-        ferries = [f.replace("\n", " ") for f in table[0][:3]]
-        days = table[0][3:]
-
-        writer.writerow([*ferries, *days])
+    ferries = [f.replace("\n", " ") for f in table[0][:3]]
+    days = table[0][3:]
+    csv_rows: List[List[Any]] = [[*ferries, *days]]
 
-        for i, row in enumerate(table[1:], 1):
-            if len(row) < 2 or not row[1]:
-                logger.debug(f"Skipping row {i}")
-                continue
+    for i, row in enumerate(table[1:], 1):
+        if len(row) < 2 or not row[1]:
+            logger.debug(f"Skipping row {i}")
+            continue
 
-            ferry_times = [parse_time_to_24h(v) for v in row[:3]]
-            service_available = [is_service_available(v) for v in row[3:]]
-            csv_row = [*ferry_times, *service_available]
+        ferry_times = [parse_time_to_24h(v) for v in row[:3]]
+        service_available = [is_service_available(v) for v in row[3:]]
+        csv_rows.append([*ferry_times, *service_available])
 
-            writer.writerow(csv_row)
-    finally:
-        if output_file:
-            output_file.close()
+    # Rows are converted before opening the output so a parse error doesn't leave a partial file
+    if output_path:
+        with open(output_path, "w", newline="") as output_file:
+            csv.writer(output_file).writerows(csv_rows)
+    else:
+        csv.writer(sys.stdout).writerows(csv_rows)
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Extract ferry schedule and output as YAML")
-    parser.add_argument("--image", help="Path to schedule image file")
-    parser.add_argument("--csv-input", help="Path to CSV file to read schedule data from (skips image parsing)")
+    parser.add_argument("--image", nargs="+", help="Path to schedule image file(s)")
+    parser.add_argument(
+        "--csv-input", nargs="+", help="Path to CSV file(s) to read schedule data from (skips image parsing)"
+    )
     parser.add_argument("--csv-output", help="Path to save CSV file (for caching parsed table data)")
     parser.add_argument("--output", help="Path to save YAML file (defaults to schedule.yaml)")
-    parser.add_argument("--start", required=True, help="Start date for schedule (YYYY-MM-DD)")
-    parser.add_argument("--name", required=True, help="The name of the schedule, e.g. Summer or Winter")
-    parser.add_argument("--end", help="End date for schedule (YYYY-MM-DD)")
+    parser.add_argument(
+        "--start", nargs="+", required=True, help="Start date for schedule (YYYY-MM-DD), one per input file"
+    )
+    parser.add_argument(
+        "--name", nargs="+", required=True, help="The name of the schedule, e.g. Summer or Winter, one per input file"
+    )
+    parser.add_argument("--end", nargs="+", help="End date for schedule (YYYY-MM-DD), one per input file")
+    parser.add_argument(
+        "--backend",
+        choices=OCR_BACKENDS,
+        default="paddle",
+        help="OCR inference backend; 'hpi' auto-selects ONNX Runtime/OpenVINO/TensorRT (default: paddle)",
+    )
+    parser.add_argument("--fp16", action="store_true", help="Run OCR models in FP16 precision (GPU only)")
+    parser.add_argument(
+        "--warmup", action="store_true", help="Warm up the OCR models on a blank image before parsing (for timing runs)"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always run OCR, ignoring cached results")
     args = parser.parse_args()
     return args
 
 
+def parse_dates(values: List[str], label: str) -> List[date]:
+    """Parse YYYY-MM-DD command line dates, exiting with an error on a bad value."""
+    dates = []
+    for value in values:
+        try:
+            dates.append(date.fromisoformat(value))
+        except ValueError:
+            logger.error(f"Invalid {label} date format: {value}. Use YYYY-MM-DD")
+            sys.exit(1)
+    return dates
+
+
 def main() -> None:
     args = parse_args()
 
@@ -285,41 +568,44 @@ def main() -> None:
         logger.error("Cannot specify both --image and --csv-input")
         sys.exit(1)
 
-    try:
-        start_date = date.fromisoformat(args.start)
-    except ValueError:
-        logger.error(f"Invalid start date format: {args.start}. Use YYYY-MM-DD")
+    inputs = [Path(p) for p in args.image or args.csv_input]
+    if len(args.start) != len(inputs) or len(args.name) != len(inputs) or (args.end and len(args.end) != len(inputs)):
+        logger.error("--start, --name and --end need one value per input file")
         sys.exit(1)
 
-    end_date = None
-    if args.end:
-        try:
-            end_date = date.fromisoformat(args.end)
-        except ValueError:
-            logger.error(f"Invalid end date format: {args.end}. Use YYYY-MM-DD")
-            sys.exit(1)
-
-    # Get table data either from image parsing or CSV input
-    if args.csv_input:
-        logger.info(f"Reading schedule data from CSV: {args.csv_input}")
-        csv_path = Path(args.csv_input)
-        table = read_csv(csv_path)
-    else:
-        image_path = Path(args.image)
-        if not image_path.exists():
-            logger.error(f"Image file not found: {image_path}")
-            sys.exit(1)
+    if args.csv_output and len(inputs) > 1:
+        logger.error("--csv-output can only be used with a single --image")
+        sys.exit(1)
 
-        logger.info(f"Parsing schedule image: {image_path}")
-        table = parse_schedule_image(image_path)
+    missing = [p for p in inputs if args.image and not p.exists()]
+    if missing:
+        logger.error(f"Image file not found: {missing[0]}")
+        sys.exit(1)
 
-        # Optionally save CSV for future use
-        if args.csv_output:
-            logger.info(f"Saving parsed data to CSV: {args.csv_output}")
-            write_csv(table, Path(args.csv_output))
+    start_dates = parse_dates(args.start, "start")
+    end_dates: List[Optional[date]] = [*parse_dates(args.end, "end")] if args.end else [None] * len(inputs)
 
+    # One parser for all images so the OCR models load once
+    page_parser = SchedulePageParser(args.backend, args.fp16, use_cache=not args.no_cache) if args.image else None
+    if page_parser and args.warmup:
+        page_parser.warmup()
     output_path = Path(args.output) if args.output else Path("schedule.yaml")
-    write_yaml_schedule(table, args.name, start_date, end_date, output_path)
+
+    for input_path, name, start_date, end_date in zip(inputs, args.name, start_dates, end_dates):
+        # Get table data either from image parsing or CSV input
+        if page_parser is None:
+            logger.info(f"Reading schedule data from CSV: {input_path}")
+            table = read_csv(input_path)
+        else:
+            logger.info(f"Parsing schedule image: {input_path}")
+            table = page_parser.parse(input_path)
+
+            # Optionally save CSV for future use
+            if args.csv_output:
+                logger.info(f"Saving parsed data to CSV: {args.csv_output}")
+                write_csv(table, Path(args.csv_output))
+
+        write_yaml_schedule(table, name, start_date, end_date, output_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,12 @@
+"""
+Centralized YAML loader/dumper selection for cb_schedule package.
+"""
+
+# Use the libyaml-backed C loader/dumper when PyYAML was built with libyaml; fall back to the
+# pure-Python implementations otherwise. Both produce identical documents.
+try:
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeDumper, SafeLoader  # type: ignore[assignment]
+
+__all__ = ["SafeDumper", "SafeLoader"]
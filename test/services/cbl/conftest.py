@@ -0,0 +1,51 @@
+"""Shared fixtures for the CBL scraper tests."""
+
+import functools
+from pathlib import Path
+
+import pytest
+
+from cb_schedule.services.cbl.scrape_schedule import parse_cbl_schedule
+
+DATA_DIR = Path(__file__).parent / "data"
+
+SUMMER_URL = "https://www.cascobaylines.com/schedules/chebeague-island-schedule/summer/"
+FALL_URL = "https://www.cascobaylines.com/schedules/chebeague-island-schedule/fall/"
+
+
+@functools.cache
+def _load_fixture(name: str) -> bytes:
+    """Read a file from the test data directory once per session, undecoded; the HTML parser decodes it."""
+    return (DATA_DIR / name).read_bytes()
+
+
+@pytest.fixture(scope="session")
+def summer_html():
+    """Summer schedule HTML test data."""
+    return _load_fixture("cbl_summer_schedule_2025.html")
+
+
+@pytest.fixture(scope="session")
+def fall_html():
+    """Fall schedule HTML test data."""
+    return _load_fixture("cbl_fall_schedule_2025.html")
+
+
+def _shared_parse(url: str, html: str):
+    """Parse a schedule for sharing between tests, failing at teardown if any test modified it."""
+    result = parse_cbl_schedule(url, html)
+    snapshot = repr(result)
+    yield result
+    assert repr(result) == snapshot, f"A test modified the shared parsed schedule for {url}"
+
+
+@pytest.fixture(scope="session")
+def summer_parsed(summer_html):
+    """The summer schedule parsed once and shared by every test; don't modify it."""
+    yield from _shared_parse(SUMMER_URL, summer_html)
+
+
+@pytest.fixture(scope="session")
+def fall_parsed(fall_html):
+    """The fall schedule parsed once and shared by every test; don't modify it."""
+    yield from _shared_parse(FALL_URL, fall_html)
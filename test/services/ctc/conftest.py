@@ -0,0 +1,18 @@
+"""Shared fixtures for the CTC schedule tests."""
+
+from pathlib import Path
+
+import pytest
+
+from cb_schedule.services.ctc.parse_schedule_image import read_csv
+
+# Sample OCR output checked into the repo
+CTC_CSV = Path(__file__).parent / "data" / "ctc_summer_schedule.csv"
+
+
+@pytest.fixture(scope="session")
+def ctc_table():
+    """The sample CSV read once per session and shared by every test; don't modify it."""
+    if not CTC_CSV.exists():
+        pytest.skip("sample CTC CSV not present")
+    return read_csv(CTC_CSV)
@@ -1,7 +1,11 @@
 """Unit tests for CTC schedule parsing functionality."""
 
+import os
 import pytest
-import tempfile
+import re
+import subprocess
+import sys
+from types import SimpleNamespace
 import yaml
 from datetime import date
 from pathlib import Path
@@ -9,131 +13,293 @@ from pathlib import Path
 from cb_schedule.services.ctc.parse_schedule_image import (
     parse_time_to_24h,
     is_service_available,
+    ocr_options,
+    SchedulePageParser,
+    _cell_str,
     read_csv,
     write_csv,
     write_yaml_schedule,
+    write_text_atomic,
+    _dump_schedule_yaml,
 )
+from cb_schedule.services.ctc import parse_schedule_image as parse_schedule_image_module
+from cb_schedule.yaml_config import SafeDumper, SafeLoader
 
 
-class TestParseTimeTo24h:
-    """Test cases for the parse_time_to_24h function."""
+# Error messages checked by pytest.raises, compiled once at import
+EMPTY_TIME = re.compile("Empty time string")
+UNPARSEABLE_TIME = re.compile("Could not parse time")
+UNRECOGNIZED_CELL = re.compile("Failed to parse")
+CSV_NOT_FOUND = re.compile("CSV file not found")
+NO_TABLE_DATA = re.compile("No data found in table")
+CANNOT_EMIT = re.compile("Cannot emit")
+
+# Cell contents the OCR produces for a day with service, and for a day without
+CHECKMARKS = ("✓", "√", "v", "V", ">", "<", "→")
+NO_SERVICE_VARIATIONS = ("No Service", "no service", "NO SERVICE", "No service", " No Service ")
 
-    def test_parse_morning_times(self):
-        """Test parsing morning times."""
-        assert parse_time_to_24h("6:30AM") == "06:30"
-        assert parse_time_to_24h("8:15AM") == "08:15"
-        assert parse_time_to_24h("10:45AM") == "10:45"
-        assert parse_time_to_24h("11:30AM") == "11:30"
-
-    def test_parse_afternoon_times(self):
-        """Test parsing afternoon/evening times."""
-        assert parse_time_to_24h("12:00PM") == "12:00"
-        assert parse_time_to_24h("2:30PM") == "14:30"
-        assert parse_time_to_24h("4:15PM") == "16:15"
-        assert parse_time_to_24h("6:30PM") == "18:30"
-        assert parse_time_to_24h("8:00PM") == "20:00"
-        assert parse_time_to_24h("11:45PM") == "23:45"
-
-    def test_parse_noon_special_case(self):
-        """Test parsing NOON special case."""
-        assert parse_time_to_24h("NOON") == "12:00"
-        assert parse_time_to_24h("noon") == "12:00"
-        assert parse_time_to_24h("Noon") == "12:00"
-
-    def test_parse_with_spaces_and_newlines(self):
-        """Test parsing times with whitespace and newlines."""
-        assert parse_time_to_24h(" 8:15PM ") == "20:15"
-        assert parse_time_to_24h("8:15PM\n") == "20:15"
-        assert parse_time_to_24h(" 8:15 PM ") == "20:15"
-
-    def test_parse_24h_format_times(self):
-        """Test parsing times already in 24-hour format."""
-        assert parse_time_to_24h("06:30") == "06:30"
-        assert parse_time_to_24h("08:00") == "08:00"
-        assert parse_time_to_24h("13:45") == "13:45"
-        assert parse_time_to_24h("23:59") == "23:59"
-        assert parse_time_to_24h(" 14:30 ") == "14:30"
-
-    def test_parse_invalid_times(self):
-        """Test parsing invalid time strings."""
-        with pytest.raises(ValueError, match="Empty time string"):
-            parse_time_to_24h("")
 
-        with pytest.raises(ValueError, match="Empty time string"):
-            parse_time_to_24h("   ")
+class TestModuleImport:
+    """Test cases for module import cost."""
 
-        with pytest.raises(ValueError, match="Could not parse time"):
-            parse_time_to_24h("invalid")
+    @pytest.mark.slow
+    def test_import_does_not_load_ocr_libraries(self):
+        """Test that importing the module leaves img2table and Paddle unloaded until OCR is needed."""
+        code = (
+            "import sys\n"
+            "import cb_schedule.services.ctc.parse_schedule_image\n"
+            "print(sorted(m for m in sys.modules if m.split('.')[0] in ('img2table', 'paddle', 'paddleocr')))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == "[]"
+
+
+class TestParseTimeTo24h:
+    """Test cases for the parse_time_to_24h function."""
 
-        with pytest.raises(ValueError, match="Could not parse time"):
-            parse_time_to_24h("25:00PM")
+    @pytest.mark.parametrize(
+        "raw,expected",
+        [
+            # Morning times
+            ("6:30AM", "06:30"),
+            ("8:15AM", "08:15"),
+            ("10:45AM", "10:45"),
+            ("11:30AM", "11:30"),
+            # Afternoon/evening times
+            ("12:00PM", "12:00"),
+            ("2:30PM", "14:30"),
+            ("4:15PM", "16:15"),
+            ("6:30PM", "18:30"),
+            ("8:00PM", "20:00"),
+            ("11:45PM", "23:45"),
+            # NOON special case
+            ("NOON", "12:00"),
+            ("noon", "12:00"),
+            ("Noon", "12:00"),
+            # Whitespace and newlines
+            (" 8:15PM ", "20:15"),
+            ("8:15PM\n", "20:15"),
+            (" 8:15 PM ", "20:15"),
+            # Already in 24-hour format
+            ("06:30", "06:30"),
+            ("08:00", "08:00"),
+            ("13:45", "13:45"),
+            ("23:59", "23:59"),
+            (" 14:30 ", "14:30"),
+        ],
+    )
+    def test_parse_time_to_24h(self, raw, expected):
+        """Test parsing 12-hour, NOON and 24-hour times."""
+        assert parse_time_to_24h(raw) == expected
+
+    @pytest.mark.parametrize(
+        "raw,match",
+        [
+            ("", EMPTY_TIME),
+            ("   ", EMPTY_TIME),
+            ("invalid", UNPARSEABLE_TIME),
+            ("25:00PM", UNPARSEABLE_TIME),
+        ],
+    )
+    def test_parse_invalid_times(self, raw, match):
+        """Test parsing invalid time strings."""
+        with pytest.raises(ValueError, match=match):
+            parse_time_to_24h(raw)
 
 
 class TestIsServiceAvailable:
     """Test cases for the is_service_available function."""
 
-    def test_checkmark_symbols_return_true(self):
+    @pytest.mark.parametrize("checkmark", CHECKMARKS)
+    def test_checkmark_symbols_return_true(self, checkmark):
         """Test that checkmark symbols return True."""
-        checkmarks = ["✓", "√", "v", "V", ">", "<", "→"]
-        for checkmark in checkmarks:
-            assert is_service_available(checkmark) is True
-            assert is_service_available(f" {checkmark} ") is True  # with spaces
-
-    def test_boolean_strings_return_correct_values(self):
+        assert is_service_available(checkmark) is True
+        assert is_service_available(f" {checkmark} ") is True  # with spaces
+
+    @pytest.mark.parametrize(
+        "content,expected",
+        [("True", True), ("true", True), (" TRUE ", True), ("False", False), ("false", False), (" FALSE ", False)],
+    )
+    def test_boolean_strings_return_correct_values(self, content, expected):
         """Test that 'True'/'False' strings return correct boolean values."""
-        assert is_service_available("True") is True
-        assert is_service_available("true") is True
-        assert is_service_available(" TRUE ") is True
-        assert is_service_available("False") is False
-        assert is_service_available("false") is False
-        assert is_service_available(" FALSE ") is False
-
-    def test_no_service_returns_false(self):
+        assert is_service_available(content) is expected
+
+    @pytest.mark.parametrize("variation", NO_SERVICE_VARIATIONS)
+    def test_no_service_returns_false(self, variation):
         """Test that 'No Service' variations return False."""
-        no_service_variations = [
-            "No Service",
-            "no service",
-            "NO SERVICE",
-            "No service",
-            " No Service ",
-        ]
-        for variation in no_service_variations:
-            assert is_service_available(variation) is False
+        assert is_service_available(variation) is False
 
-    def test_empty_content_returns_false(self):
+    @pytest.mark.parametrize("content", ["", None, "   "])
+    def test_empty_content_returns_false(self, content):
         """Test that empty content returns False."""
-        assert is_service_available("") is False
-        assert is_service_available(None) is False
-        assert is_service_available("   ") is False
+        assert is_service_available(content) is False
 
-    def test_unrecognized_content_raises_error(self):
+    @pytest.mark.parametrize("content", ["unknown", "?"])
+    def test_unrecognized_content_raises_error(self, content):
         """Test that unrecognized content raises ValueError."""
-        with pytest.raises(ValueError, match="Failed to parse"):
-            is_service_available("unknown")
-
-        with pytest.raises(ValueError, match="Failed to parse"):
-            is_service_available("?")
+        with pytest.raises(ValueError, match=UNRECOGNIZED_CELL):
+            is_service_available(content)
+
+
+class TestOcrOptions:
+    """Test cases for the ocr_options function."""
+
+    def test_default_backend(self):
+        """Test that the default backend stays on Paddle Inference in FP32."""
+        options = ocr_options()
+        assert options["precision"] == "fp32"
+        assert options["enable_mkldnn"] is True
+        assert "enable_hpi" not in options
+        assert "use_tensorrt" not in options
+
+    def test_single_item_batches(self):
+        """Test that recognition runs one text line per predictor call."""
+        options = ocr_options()
+        assert options["text_recognition_batch_size"] == 1
+        assert options["textline_orientation_batch_size"] == 1
+
+    def test_hpi_backend_with_fp16(self):
+        """Test that the hpi backend enables high-performance inference."""
+        options = ocr_options("hpi", fp16=True)
+        assert options["enable_hpi"] is True
+        assert options["precision"] == "fp16"
+
+    def test_tensorrt_backend(self):
+        """Test that the tensorrt backend enables TensorRT."""
+        assert ocr_options("tensorrt")["use_tensorrt"] is True
+
+    def test_unknown_backend_raises_error(self):
+        """Test that an unknown backend raises ValueError."""
+        with pytest.raises(ValueError, match="Unknown OCR backend"):
+            ocr_options("cuda")
+
+
+class TestCellStr:
+    """Test cases for the _cell_str function."""
+
+    def test_cell_values(self):
+        """Test conversion of table cells, raw strings and empty cells to text."""
+        assert _cell_str(SimpleNamespace(value="6:30AM")) == "6:30AM"
+        assert _cell_str(SimpleNamespace(value=None)) == ""
+        assert _cell_str(None) == ""
+        assert _cell_str("NOON") == "NOON"
+        assert _cell_str(5) == "5"
+
+
+class TestSchedulePageParser:
+    """Test cases for SchedulePageParser and its OCR result cache."""
+
+    def test_second_parse_uses_cache(self, tmp_path, monkeypatch, mocker):
+        """Test that OCR runs once for repeated parses of the same image contents."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        rows = [["DEPARTS CHEBEAGUE", "DEPARTS COUSINS"], ["6:30AM", "6:45AM"]]
+        mock_extract = mocker.patch.object(SchedulePageParser, "extract", return_value=rows)
+        image_path = tmp_path / "schedule.jpg"
+        image_path.write_bytes(b"image")
+        copy_path = tmp_path / "copy.jpg"
+        copy_path.write_bytes(b"image")
+
+        parser = SchedulePageParser()
+        assert parser.parse(image_path) == rows
+        assert SchedulePageParser().parse(copy_path) == rows
+        mock_extract.assert_called_once_with(b"image")
+        assert len(list((tmp_path / "cache" / "cb_schedule" / "ocr").glob("*.json"))) == 1
+
+    def test_changed_image_is_parsed_again(self, tmp_path, monkeypatch, mocker):
+        """Test that a different image is not served from the cache."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        mock_extract = mocker.patch.object(SchedulePageParser, "extract", return_value=[["A"]])
+        parser = SchedulePageParser()
+        image_path = tmp_path / "schedule.jpg"
+        image_path.write_bytes(b"summer")
+        parser.parse(image_path)
+        image_path.write_bytes(b"winter")
+        parser.parse(image_path)
+
+        assert mock_extract.call_count == 2
+
+    def test_backend_and_precision_have_separate_entries(self, tmp_path, monkeypatch, mocker):
+        """Test that a result cached for one backend or precision is not reused for another."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        mock_extract = mocker.patch.object(SchedulePageParser, "extract", return_value=[["A"]])
+        image_path = tmp_path / "schedule.jpg"
+        image_path.write_bytes(b"image")
+        SchedulePageParser().parse(image_path)
+        SchedulePageParser(fp16=True).parse(image_path)
+        SchedulePageParser(backend="hpi").parse(image_path)
+        SchedulePageParser(backend="hpi").parse(image_path)
+
+        assert mock_extract.call_count == 3
+
+    def test_unwritable_cache_still_returns_rows(self, tmp_path, monkeypatch, mocker):
+        """Test that a cache write failure is logged and the OCR result is still returned."""
+        cache_home = tmp_path / "cache"
+        cache_home.write_text("not a directory")
+        monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+        mocker.patch.object(SchedulePageParser, "extract", return_value=[["A"]])
+        image_path = tmp_path / "schedule.jpg"
+        image_path.write_bytes(b"image")
+
+        assert SchedulePageParser().parse(image_path) == [["A"]]
+
+    def test_no_cache_always_extracts(self, tmp_path, monkeypatch, mocker):
+        """Test that use_cache=False neither reads nor writes the cache."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        mock_extract = mocker.patch.object(SchedulePageParser, "extract", return_value=[["A"]])
+        image_path = tmp_path / "schedule.jpg"
+        image_path.write_bytes(b"image")
+        parser = SchedulePageParser(use_cache=False)
+        parser.parse(image_path)
+        parser.parse(image_path)
+
+        assert mock_extract.call_count == 2
+        assert not (tmp_path / "cache").exists()
+
+    def test_ocr_is_built_once_on_first_use(self, mocker):
+        """Test that the OCR models are loaded lazily and shared across images."""
+        mock_ocr = mocker.patch("img2table.ocr.PaddleOCR")
+        parser = SchedulePageParser()
+        mock_ocr.assert_not_called()
+
+        assert parser.ocr is parser.ocr
+        mock_ocr.assert_called_once()
+
+    def test_warmup_runs_blank_image(self, mocker):
+        """Test that warmup feeds a blank image through the OCR instance's public interface."""
+
+        class StubOCR:
+            def __init__(self):
+                self.documents = []
+
+            def of(self, document):
+                self.documents.append(document)
+
+        parser = SchedulePageParser()
+        parser._ocr = stub = StubOCR()
+        warning = mocker.patch.object(parse_schedule_image_module.logger, "warning")
+        parser.warmup()
+
+        (document,) = stub.documents
+        (image,) = document.images
+        assert (image == 255).all()
+        warning.assert_not_called()
 
 
 class TestCsvOperations:
     """Test cases for CSV read/write operations."""
 
-    def test_read_csv_success(self):
+    def test_read_csv_success(self, ctc_table):
         """Test successful CSV reading."""
-        # Use the existing test data file
-        csv_path = Path("test/services/ctc/data/ctc_summer_schedule.csv")
-        if csv_path.exists():
-            table = read_csv(csv_path)
-            assert len(table) > 0
-            assert len(table[0]) == 10  # header row has 10 columns
-            assert table[0][0] == "BUS DEPARTS ROUTE 1"
+        assert len(ctc_table) > 0
+        assert len(ctc_table[0]) == 10  # header row has 10 columns
+        assert ctc_table[0][0] == "BUS DEPARTS ROUTE 1"
 
     def test_read_csv_file_not_found(self):
         """Test CSV reading with non-existent file."""
-        with pytest.raises(FileNotFoundError, match="CSV file not found"):
+        with pytest.raises(FileNotFoundError, match=CSV_NOT_FOUND):
             read_csv(Path("nonexistent.csv"))
 
-    def test_write_and_read_csv_roundtrip(self):
+    def test_write_and_read_csv_roundtrip(self, tmp_path):
         """Test writing CSV and reading it back."""
         test_data = [
             ["BUS DEPARTS ROUTE 1", "DEPARTS CHEBEAGUE", "DEPARTS COUSINS", "MON", "TUES"],
@@ -141,96 +307,85 @@ class TestCsvOperations:
             ["07:45", "08:00", "08:15", "True", "True"],
         ]
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False) as f:
-            temp_path = Path(f.name)
+        temp_path = tmp_path / "schedule.csv"
 
-        try:
-            # Write CSV
-            write_csv(test_data, temp_path)
+        # Write CSV
+        write_csv(test_data, temp_path)
 
-            # Read it back
-            result = read_csv(temp_path)
+        # Read it back
+        result = read_csv(temp_path)
 
-            assert result == test_data
-        finally:
-            temp_path.unlink(missing_ok=True)
+        assert result == test_data
 
-    def test_read_existing_test_csv(self):
+    def test_read_existing_test_csv(self, ctc_table):
         """Test reading the existing test CSV file."""
-        csv_path = Path("test/services/ctc/data/ctc_summer_schedule.csv")
-        if csv_path.exists():
-            table = read_csv(csv_path)
-
-            # Verify structure
-            assert len(table) > 1  # At least header + 1 data row
-            assert table[0][0] == "BUS DEPARTS ROUTE 1"
-            assert table[0][1] == "DEPARTS CHEBEAGUE"
-            assert table[0][2] == "DEPARTS COUSINS"
-
-            # Verify a data row
-            if len(table) > 1:
-                # First data row should be: 06:15,06:30,06:45,True,True,True,True,True,True,False
-                first_row = table[1]
-                assert first_row[0] == "06:15"
-                assert first_row[1] == "06:30"
-                assert first_row[2] == "06:45"
-                assert first_row[3] == "True"  # Monday
-                assert first_row[9] == "False"  # Sunday
+        # Verify structure
+        assert len(ctc_table) > 1  # At least header + 1 data row
+        assert ctc_table[0][0] == "BUS DEPARTS ROUTE 1"
+        assert ctc_table[0][1] == "DEPARTS CHEBEAGUE"
+        assert ctc_table[0][2] == "DEPARTS COUSINS"
+
+        # Verify a data row
+        # First data row should be: 06:15,06:30,06:45,True,True,True,True,True,True,False
+        first_row = ctc_table[1]
+        assert first_row[0] == "06:15"
+        assert first_row[1] == "06:30"
+        assert first_row[2] == "06:45"
+        assert first_row[3] == "True"  # Monday
+        assert first_row[9] == "False"  # Sunday
 
     def test_write_csv_empty_table(self):
         """Test writing empty table raises error."""
-        with pytest.raises(ValueError, match="No data found in table"):
+        with pytest.raises(ValueError, match=NO_TABLE_DATA):
             write_csv([])
 
 
+@pytest.fixture(scope="module")
+def sample_table():
+    """Schedule table with a header and two departures, shared by the module's tests; don't modify it."""
+    return [
+        [
+            "BUS DEPARTS ROUTE 1",
+            "DEPARTS CHEBEAGUE",
+            "DEPARTS COUSINS",
+            "MON",
+            "TUES",
+            "WED",
+            "THURS",
+            "FRI",
+            "SAT",
+            "SUN",
+        ],
+        ["06:15", "06:30", "06:45", "True", "True", "True", "True", "True", "True", "False"],
+        ["07:45", "08:00", "08:15", "True", "True", "True", "True", "True", "True", "True"],
+    ]
+
+
 class TestYamlScheduleWriting:
     """Test cases for YAML schedule writing."""
 
-    def test_write_yaml_schedule_new_file(self):
+    def test_write_yaml_schedule_new_file(self, sample_table, tmp_path):
         """Test writing YAML schedule to new file."""
-        test_table = [
-            [
-                "BUS DEPARTS ROUTE 1",
-                "DEPARTS CHEBEAGUE",
-                "DEPARTS COUSINS",
-                "MON",
-                "TUES",
-                "WED",
-                "THURS",
-                "FRI",
-                "SAT",
-                "SUN",
-            ],
-            ["06:15", "06:30", "06:45", "True", "True", "True", "True", "True", "True", "False"],
-            ["07:45", "08:00", "08:15", "True", "True", "True", "True", "True", "True", "True"],
-        ]
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            temp_path = Path(f.name)
-
-        try:
-            write_yaml_schedule(test_table, "Test Schedule", date(2025, 6, 1), date(2025, 9, 15), temp_path)
+        temp_path = tmp_path / "schedule.yaml"
 
-            # Verify the file was created and has expected structure
-            with open(temp_path) as f:
-                data = yaml.safe_load(f)
+        write_yaml_schedule(sample_table, "Test Schedule", date(2025, 6, 1), date(2025, 9, 15), temp_path)
 
-            assert "services" in data
-            assert "ctc" in data["services"]
-            assert "schedules" in data["services"]["ctc"]
-            assert len(data["services"]["ctc"]["schedules"]) == 1
+        # Verify the file was created and has expected structure
+        data = yaml.load(temp_path.read_bytes(), Loader=SafeLoader)
 
-            schedule = data["services"]["ctc"]["schedules"][0]
-            assert schedule["name"] == "Test Schedule"
-            assert schedule["start"] == date(2025, 6, 1)
-            assert schedule["end"] == date(2025, 9, 15)
-            assert "ferries" in schedule
-            assert len(schedule["ferries"]) == 4  # 2 rows × 2 directions
+        assert "services" in data
+        assert "ctc" in data["services"]
+        assert "schedules" in data["services"]["ctc"]
+        assert len(data["services"]["ctc"]["schedules"]) == 1
 
-        finally:
-            temp_path.unlink(missing_ok=True)
+        schedule = data["services"]["ctc"]["schedules"][0]
+        assert schedule["name"] == "Test Schedule"
+        assert schedule["start"] == date(2025, 6, 1)
+        assert schedule["end"] == date(2025, 9, 15)
+        assert "ferries" in schedule
+        assert len(schedule["ferries"]) == 4  # 2 rows × 2 directions
 
-    def test_write_yaml_schedule_append_to_existing(self):
+    def test_write_yaml_schedule_append_to_existing(self, sample_table, tmp_path):
         """Test appending schedule to existing YAML file."""
         # Create initial YAML content
         initial_data = {
@@ -242,44 +397,22 @@ class TestYamlScheduleWriting:
             }
         }
 
-        test_table = [
-            [
-                "BUS DEPARTS ROUTE 1",
-                "DEPARTS CHEBEAGUE",
-                "DEPARTS COUSINS",
-                "MON",
-                "TUES",
-                "WED",
-                "THURS",
-                "FRI",
-                "SAT",
-                "SUN",
-            ],
-            ["06:15", "06:30", "06:45", "True", "True", "True", "True", "True", "True", "False"],
-        ]
+        temp_path = tmp_path / "schedule.yaml"
+        temp_path.write_text(yaml.dump(initial_data, Dumper=SafeDumper))
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            temp_path = Path(f.name)
-            yaml.dump(initial_data, f)
+        write_yaml_schedule(sample_table[:2], "New Schedule", date(2025, 6, 1), None, temp_path)
 
-        try:
-            write_yaml_schedule(test_table, "New Schedule", date(2025, 6, 1), None, temp_path)
+        # Verify both schedules exist
+        data = yaml.load(temp_path.read_bytes(), Loader=SafeLoader)
 
-            # Verify both schedules exist
-            with open(temp_path) as f:
-                data = yaml.safe_load(f)
+        schedules = data["services"]["ctc"]["schedules"]
+        assert len(schedules) == 2
 
-            schedules = data["services"]["ctc"]["schedules"]
-            assert len(schedules) == 2
+        # Should be sorted by start date
+        assert schedules[0]["name"] == "Existing Schedule"
+        assert schedules[1]["name"] == "New Schedule"
 
-            # Should be sorted by start date
-            assert schedules[0]["name"] == "Existing Schedule"
-            assert schedules[1]["name"] == "New Schedule"
-
-        finally:
-            temp_path.unlink(missing_ok=True)
-
-    def test_write_yaml_schedule_replace_existing(self):
+    def test_write_yaml_schedule_replace_existing(self, sample_table, tmp_path):
         """Test replacing schedule with same start date."""
         # Create initial YAML with schedule on 2025-06-01
         initial_data = {
@@ -291,53 +424,165 @@ class TestYamlScheduleWriting:
             }
         }
 
-        test_table = [
-            [
-                "BUS DEPARTS ROUTE 1",
-                "DEPARTS CHEBEAGUE",
-                "DEPARTS COUSINS",
-                "MON",
-                "TUES",
-                "WED",
-                "THURS",
-                "FRI",
-                "SAT",
-                "SUN",
-            ],
-            ["06:15", "06:30", "06:45", "True", "True", "True", "True", "True", "True", "False"],
-        ]
+        temp_path = tmp_path / "schedule.yaml"
+        temp_path.write_text(yaml.dump(initial_data, Dumper=SafeDumper))
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            temp_path = Path(f.name)
-            yaml.dump(initial_data, f)
+        write_yaml_schedule(
+            sample_table[:2],
+            "New Summer Schedule",
+            date(2025, 6, 1),  # Same start date
+            None,
+            temp_path,
+        )
 
-        try:
-            write_yaml_schedule(
-                test_table,
-                "New Summer Schedule",
-                date(2025, 6, 1),  # Same start date
-                None,
-                temp_path,
-            )
-
-            # Verify old schedule was replaced
-            with open(temp_path) as f:
-                data = yaml.safe_load(f)
-
-            schedules = data["services"]["ctc"]["schedules"]
-            assert len(schedules) == 1
-            assert schedules[0]["name"] == "New Summer Schedule"
+        # Verify old schedule was replaced
+        data = yaml.load(temp_path.read_bytes(), Loader=SafeLoader)
 
-        finally:
-            temp_path.unlink(missing_ok=True)
+        schedules = data["services"]["ctc"]["schedules"]
+        assert len(schedules) == 1
+        assert schedules[0]["name"] == "New Summer Schedule"
+
+    def test_write_yaml_schedule_unchanged_skips_write(self, tmp_path, mocker):
+        """Test that writing the same schedule again leaves the file untouched."""
+        schedule_path = tmp_path / "schedule.yaml"
+        table = [["BUS", "DEPARTS CHEBEAGUE", "DEPARTS COUSINS", "MON"], ["06:15", "06:30", "06:45", "True"]]
+        write_yaml_schedule(table, "Summer", date(2025, 6, 1), None, schedule_path)
 
-    def test_write_yaml_schedule_empty_table(self):
+        spy = mocker.spy(parse_schedule_image_module, "write_text_atomic")
+        write_yaml_schedule(table, "Summer", date(2025, 6, 1), None, schedule_path)
+        spy.assert_not_called()
+
+        write_yaml_schedule(table, "Summer (revised)", date(2025, 6, 1), None, schedule_path)
+        spy.assert_called_once()
+
+    def test_write_yaml_schedule_empty_table(self, tmp_path):
         """Test writing empty table raises error."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            temp_path = Path(f.name)
+        temp_path = tmp_path / "schedule.yaml"
+
+        with pytest.raises(ValueError, match=NO_TABLE_DATA):
+            write_yaml_schedule([], "Test", date.today(), None, temp_path)
+
+
+class TestWriteTextAtomic:
+    """Test cases for the write_text_atomic function."""
+
+    def test_replaces_contents_and_keeps_mode(self, tmp_path):
+        """Test that the file is replaced with its permissions intact and no temp file left behind."""
+        path = tmp_path / "schedule.yaml"
+        path.write_text("old: true\n")
+        path.chmod(0o640)
+
+        write_text_atomic(path, "new: true\n")
+
+        assert path.read_text() == "new: true\n"
+        assert path.stat().st_mode & 0o777 == 0o640
+        assert [p.name for p in tmp_path.iterdir()] == ["schedule.yaml"]
 
+    @pytest.mark.parametrize("umask", [0o022, 0o077])
+    def test_new_file_follows_umask(self, tmp_path, umask):
+        """Test that a new file gets the same mode open() would give it under the current umask."""
+        expected_path = tmp_path / "expected.yaml"
+        path = tmp_path / "schedule.yaml"
+        old_umask = os.umask(umask)
         try:
-            with pytest.raises(ValueError, match="No data found in table"):
-                write_yaml_schedule([], "Test", date.today(), None, temp_path)
+            expected_path.write_text("new: true\n")
+            write_text_atomic(path, "new: true\n")
         finally:
-            temp_path.unlink(missing_ok=True)
+            os.umask(old_umask)
+
+        assert path.stat().st_mode & 0o777 == expected_path.stat().st_mode & 0o777 == 0o666 & ~umask
+
+    def test_failed_write_leaves_original(self, tmp_path, mocker):
+        """Test that an error while replacing keeps the original file and cleans up."""
+        path = tmp_path / "schedule.yaml"
+        path.write_text("old: true\n")
+        mocker.patch("cb_schedule.services.ctc.parse_schedule_image.os.replace", side_effect=OSError("disk full"))
+
+        with pytest.raises(OSError, match="disk full"):
+            write_text_atomic(path, "new: true\n")
+
+        assert path.read_text() == "old: true\n"
+        assert [p.name for p in tmp_path.iterdir()] == ["schedule.yaml"]
+
+
+class TestDumpScheduleYaml:
+    """Test cases for the _dump_schedule_yaml emitter."""
+
+    def test_matches_yaml_dump(self):
+        """Test that output is identical to yaml.dump, including anchors for shared lists."""
+        weekdays = ["MO", "TU", "WE", "TH", "FR"]
+        data = {
+            "services": {
+                "ctc": {
+                    "tzid": "America/New_York",
+                    "schedules": [
+                        {
+                            "name": "Summer: Late",
+                            "url": "https://www.ctcferry.org/#schedule",
+                            "start": date(2025, 6, 1),
+                            "end": date(2025, 9, 15),
+                            "ferries": [
+                                {
+                                    "time": "06:30",
+                                    "from": "Chebeague Island",
+                                    "to": "Cousins Island",
+                                    "byday": weekdays,
+                                },
+                                {
+                                    "time": "10:00",
+                                    "from": "Cousins Island",
+                                    "to": "Chebeague Island",
+                                    "byday": weekdays,
+                                },
+                                {"time": "12:00", "from": "Cousins Island", "to": "Chebeague Island", "byday": []},
+                            ],
+                        },
+                        {"name": "Winter's", "start": date(2025, 9, 16), "ferries": [], "notes": {}},
+                    ],
+                }
+            }
+        }
+
+        expected = yaml.dump(data, Dumper=SafeDumper, default_flow_style=False, sort_keys=False)
+        assert _dump_schedule_yaml(data) == expected
+        assert "&id001" in expected
+
+    @pytest.mark.parametrize("length", range(60, 90))
+    def test_long_names_and_urls_match_yaml_dump(self, length):
+        """Test that long values are emitted exactly as yaml.dump would fold them, or left to it."""
+        schedule = {
+            "name": ("Summer " * 20)[: length - 1] + "x",
+            "url": "https://www.ctcferry.org/schedules/" + "x" * length,
+            "notes": "See " + "y" * (length - 30) + " for details",
+            "start": date(2025, 6, 1),
+        }
+        data = {"services": {"ctc": {"tzid": "America/New_York", "schedules": [schedule]}}}
+
+        expected = yaml.dump(data, Dumper=SafeDumper, default_flow_style=False, sort_keys=False)
+        try:
+            assert _dump_schedule_yaml(data) == expected
+        except ValueError:
+            pass  # write_yaml_schedule falls back to yaml.dump for these
+
+    def test_long_key_raises_error(self):
+        """Test that keys yaml.dump writes in explicit "? key" form are left to yaml.dump."""
+        with pytest.raises(ValueError, match=CANNOT_EMIT):
+            _dump_schedule_yaml({"k" * 128: "value"})
+
+    def test_unsupported_values_raise_error(self):
+        """Test that values outside the schedule schema raise ValueError."""
+        with pytest.raises(ValueError, match=CANNOT_EMIT):
+            _dump_schedule_yaml({"name": "line\nbreak"})
+
+        with pytest.raises(ValueError, match=CANNOT_EMIT):
+            _dump_schedule_yaml({"ratio": 1.5})
+
+    def test_write_yaml_schedule_falls_back_to_yaml_dump(self, tmp_path):
+        """Test that a name the emitter can't write is still saved correctly."""
+        schedule_path = tmp_path / "schedule.yaml"
+        table = [["BUS", "DEPARTS CHEBEAGUE", "DEPARTS COUSINS"], ["06:15", "06:30", "06:45"]]
+
+        write_yaml_schedule(table, "Été", date(2025, 6, 1), None, schedule_path)
+
+        data = yaml.load(schedule_path.read_bytes(), Loader=SafeLoader)
+        assert data["services"]["ctc"]["schedules"][0]["name"] == "Été"
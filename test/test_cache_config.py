@@ -0,0 +1,77 @@
+"""Unit tests for on-disk cache helpers."""
+
+import os
+import pickle
+
+import pytest
+import yaml
+
+from cb_schedule.cache_config import cache_dir, load_yaml_cached, store_yaml_cache
+
+
+class TestCacheDir:
+    """Test cases for the cache_dir function."""
+
+    def test_respects_xdg_cache_home(self, tmp_path, monkeypatch):
+        """Test that the cache lives under $XDG_CACHE_HOME."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        assert cache_dir("ocr") == tmp_path / "cb_schedule" / "ocr"
+
+
+class TestLoadYamlCached:
+    """Test cases for the load_yaml_cached function."""
+
+    def test_unchanged_file_is_not_parsed_again(self, tmp_path, mocker):
+        """Test that a second load of an unchanged file comes from the cache."""
+        path = tmp_path / "schedule.yaml"
+        path.write_text("services:\n  ctc:\n    tzid: America/New_York\n")
+        spy = mocker.spy(yaml, "load")
+
+        first = load_yaml_cached(path)
+        second = load_yaml_cached(path)
+
+        assert first == second == {"services": {"ctc": {"tzid": "America/New_York"}}}
+        assert second is not first
+        assert spy.call_count == 1
+
+    def test_modified_file_is_parsed_again(self, tmp_path):
+        """Test that changing the file invalidates the cached data."""
+        path = tmp_path / "schedule.yaml"
+        path.write_text("name: Summer\n")
+        load_yaml_cached(path)
+
+        path.write_text("name: Winter\n")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+        assert load_yaml_cached(path) == {"name": "Winter"}
+
+    def test_store_yaml_cache_records_written_data(self, tmp_path, mocker):
+        """Test that data stored after writing a file is returned without parsing."""
+        path = tmp_path / "schedule.yaml"
+        path.write_text("name: Fall\n")
+        store_yaml_cache(path, {"name": "Fall"})
+        spy = mocker.spy(yaml, "load")
+
+        assert load_yaml_cached(path) == {"name": "Fall"}
+        spy.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "contents",
+        [
+            b"not a pickle",
+            pickle.dumps((1, 2, {"name": "Winter"}))[:-3],
+            pickle.dumps((1, 2)),
+            pickle.dumps(None),
+        ],
+        ids=["garbage", "truncated", "old-format", "not-a-tuple"],
+    )
+    def test_corrupt_cache_falls_back_to_parse(self, tmp_path, contents):
+        """Test that an unreadable cache entry is ignored."""
+        path = tmp_path / "schedule.yaml"
+        path.write_text("name: Summer\n")
+        load_yaml_cached(path)
+        for cache_file in cache_dir("yaml").glob("*.pkl"):
+            cache_file.write_bytes(contents)
+
+        assert load_yaml_cached(path) == {"name": "Summer"}
@@ -0,0 +1,226 @@
+"""Unit tests for static site publishing."""
+
+import json
+import shutil
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+import cb_schedule
+from cb_schedule import publish as publish_module
+from cb_schedule.publish import BUILD_MANIFEST, partition_ferries, publish_site
+from cb_schedule.render_day import FerryInfo
+
+TEMPLATE_DIR = Path(cb_schedule.__file__).parent / "templates"
+
+SCHEDULE_YAML = """\
+services:
+  cbl:
+    tzid: America/New_York
+    schedules:
+    - name: Summer
+      start: 2025-06-01
+      url: https://example.com/schedule
+      ferries:
+      - time: 06:30
+        from: Portland
+        to: Chebeague Island
+        byday: [MO, TU, WE, TH, FR, SA, SU]
+      - time: '07:15'
+        from: Chebeague Island
+        to: Portland
+        byday: [MO, TU, WE, TH, FR, SA, SU]
+"""
+
+
+@pytest.fixture
+def schedule_path(tmp_path):
+    """Small one-service schedule file."""
+    path = tmp_path / "schedule.yaml"
+    path.write_text(SCHEDULE_YAML)
+    return path
+
+
+DATES = ["2025-06-01", "2025-06-02", "2025-06-03"]
+
+
+def publish(schedule_path, output_dir, template_dir=TEMPLATE_DIR, **kwargs):
+    """Publish three days from 2025-06-01 (a Sunday) in the current process."""
+    kwargs.setdefault("jobs", 1)
+    publish_site(schedule_path, template_dir, output_dir, date(2025, 6, 1), days=3, **kwargs)
+
+
+@pytest.fixture
+def rendered_dates(monkeypatch):
+    """ISO dates passed to render_date_pages, in call order."""
+    rendered = []
+    render_date_pages = publish_module.render_date_pages
+
+    def record(current_date, *args, **kwargs):
+        rendered.append(current_date.isoformat())
+        return render_date_pages(current_date, *args, **kwargs)
+
+    monkeypatch.setattr(publish_module, "render_date_pages", record)
+    return rendered
+
+
+def ferry(start_location, end_location):
+    return FerryInfo("cbl", "#", "06:30", "06:30", 390, start_location, end_location)
+
+
+class TestPartitionFerries:
+    """Test cases for splitting a day's ferries into arrivals and departures."""
+
+    def test_matches_direction_filters(self):
+        """Test that the split matches filtering on end_location and start_location separately."""
+        # Built at runtime so the names are equal to, but not the same object as, the interned HOME_ISLAND
+        island = "".join(["Chebeague", " Island"])
+        ferries = [
+            ferry("Portland", island),
+            ferry(island, "Portland"),
+            ferry("Portland", "Cliff Island"),
+            ferry(None, None),
+            ferry(island, None),
+            ferry(None, island),
+            ferry(island, island),
+            ferry("chebeague island", "Portland"),
+        ]
+
+        arrive, depart = partition_ferries(ferries)
+
+        assert arrive == [f for f in ferries if f.end_location == "Chebeague Island"]
+        assert depart == [f for f in ferries if f.start_location == "Chebeague Island"]
+        assert arrive == [ferries[0], ferries[5], ferries[6]]
+        assert depart == [ferries[1], ferries[4], ferries[6]]
+
+    def test_empty_day(self):
+        """Test that a day without ferries has no arrivals or departures."""
+        assert partition_ferries([]) == ([], [])
+
+
+class TestPublishSite:
+    """Test cases for publish_site."""
+
+    def test_publishes_main_and_filtered_pages(self, schedule_path, tmp_path):
+        """Test that every date gets its main, arrivals and departures pages."""
+        output_dir = tmp_path / "site"
+        publish(schedule_path, output_dir)
+
+        assert (output_dir / "index.html").exists()
+        assert (output_dir / "styles.css").exists()
+        for day in ("2025-06-01", "2025-06-02", "2025-06-03"):
+            for page in ("index.html", "arrive/index.html", "depart/index.html"):
+                assert (output_dir / day / page).exists()
+
+    def test_republish_after_output_removed(self, schedule_path, tmp_path):
+        """Test that a second publish in the same process recreates a deleted output tree."""
+        output_dir = tmp_path / "site"
+        publish(schedule_path, output_dir)
+        shutil.rmtree(output_dir)
+
+        publish(schedule_path, output_dir)
+
+        assert (output_dir / "styles.css").exists()
+        assert (output_dir / "2025-06-01" / "arrive" / "index.html").exists()
+
+    def test_plain_republish_removes_compressed_copies(self, schedule_path, tmp_path):
+        """Test that republishing without compress drops the copies a compressed publish wrote."""
+        output_dir = tmp_path / "site"
+        publish(schedule_path, output_dir, compress=True)
+        assert (output_dir / "2025-06-01" / "index.html.gz").exists()
+
+        publish(schedule_path, output_dir)
+
+        assert not [path for suffix in (".gz", ".br") for path in output_dir.rglob(f"*{suffix}")]
+        assert (output_dir / "2025-06-01" / "index.html").exists()
+
+    def test_worker_pool_matches_serial(self, schedule_path, tmp_path, monkeypatch):
+        """Test that rendering in worker processes writes the same files as rendering in-process."""
+        monkeypatch.setattr(publish_module, "generation_timestamp", lambda: "2025-06-01 12:00")
+        serial_dir = tmp_path / "serial"
+        pool_dir = tmp_path / "pool"
+        publish(schedule_path, serial_dir)
+        publish(schedule_path, pool_dir, jobs=2)
+
+        serial_files = sorted(path.relative_to(serial_dir) for path in serial_dir.rglob("*") if path.is_file())
+        pool_files = sorted(path.relative_to(pool_dir) for path in pool_dir.rglob("*") if path.is_file())
+        assert pool_files == serial_files
+        for path in serial_files:
+            assert (pool_dir / path).read_bytes() == (serial_dir / path).read_bytes(), path
+
+
+class TestIncrementalPublish:
+    """Test cases for skipping dates whose inputs are unchanged since the last publish."""
+
+    def test_unchanged_dates_are_skipped(self, schedule_path, tmp_path, rendered_dates):
+        """Test that republishing unchanged inputs renders nothing and leaves the pages untouched."""
+        output_dir = tmp_path / "site"
+        publish(schedule_path, output_dir)
+        assert rendered_dates == DATES
+        page = output_dir / "2025-06-02" / "index.html"
+        mtime = page.stat().st_mtime_ns
+
+        rendered_dates.clear()
+        publish(schedule_path, output_dir)
+
+        assert rendered_dates == []
+        assert page.stat().st_mtime_ns == mtime
+
+    def test_force_rerenders(self, schedule_path, tmp_path, rendered_dates):
+        """Test that force renders every date even when nothing changed."""
+        output_dir = tmp_path / "site"
+        publish(schedule_path, output_dir)
+        rendered_dates.clear()
+
+        publish(schedule_path, output_dir, force=True)
+
+        assert rendered_dates == DATES
+
+    def test_schedule_change_rerenders_affected_dates(self, schedule_path, tmp_path, rendered_dates):
+        """Test that dropping Sunday from a ferry re-renders only the Sunday."""
+        output_dir = tmp_path / "site"
+        publish(schedule_path, output_dir)
+        rendered_dates.clear()
+
+        schedule_path.write_text(SCHEDULE_YAML.replace("FR, SA, SU]", "FR, SA]", 1))
+        publish(schedule_path, output_dir)
+
+        assert rendered_dates == ["2025-06-01"]
+
+    def test_template_change_rerenders(self, schedule_path, tmp_path, rendered_dates):
+        """Test that editing a template re-renders every date."""
+        template_dir = tmp_path / "templates"
+        shutil.copytree(TEMPLATE_DIR, template_dir)
+        output_dir = tmp_path / "site"
+        publish(schedule_path, output_dir, template_dir)
+        rendered_dates.clear()
+
+        day_template = template_dir / "day.html"
+        day_template.write_text(day_template.read_text() + "<!-- edited -->\n")
+        publish(schedule_path, output_dir, template_dir)
+
+        assert rendered_dates == DATES
+
+    @pytest.mark.parametrize("option", ["use_12h", "compress"])
+    def test_option_change_rerenders(self, schedule_path, tmp_path, rendered_dates, option):
+        """Test that switching 12-hour times or compression re-renders every date."""
+        output_dir = tmp_path / "site"
+        publish(schedule_path, output_dir)
+        rendered_dates.clear()
+
+        publish(schedule_path, output_dir, **{option: True})
+
+        assert rendered_dates == DATES
+
+    def test_corrupt_manifest_rebuilds(self, schedule_path, tmp_path, rendered_dates):
+        """Test that an unreadable build manifest is treated as empty, so every date is rendered."""
+        output_dir = tmp_path / "site"
+        publish(schedule_path, output_dir)
+        rendered_dates.clear()
+
+        (output_dir / BUILD_MANIFEST).write_text("{not json")
+        publish(schedule_path, output_dir)
+
+        assert rendered_dates == DATES
+        assert json.loads((output_dir / BUILD_MANIFEST).read_text()).keys() == set(DATES)
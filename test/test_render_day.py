@@ -0,0 +1,321 @@
+"""Unit tests for day page rendering."""
+
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+import cb_schedule
+from cb_schedule.render_day import (
+    FerryInfo,
+    ScheduleIndex,
+    _minutes_after_midnight,
+    _render_ferry_row_cached,
+    find_active_schedule,
+    format_time,
+    get_environment,
+    render_day_html,
+    render_ferry_row,
+)
+
+TEMPLATE_DIR = Path(cb_schedule.__file__).parent / "templates"
+
+SUMMER = {"name": "Summer", "start": date(2025, 6, 1), "end": date(2025, 8, 31)}
+FALL = {"name": "Fall", "start": date(2025, 9, 1), "end": date(2025, 10, 31)}
+# Starts inside SUMMER, but SUMMER comes first in the file and wins where they overlap
+HOLIDAY = {"name": "Holiday", "start": date(2025, 7, 1), "end": date(2025, 9, 15)}
+OPEN_ENDED = {"name": "Winter", "start": date(2025, 11, 1)}
+NULL_END = {"name": "Spring", "start": date(2025, 3, 1), "end": None}
+NO_START = {"name": "Draft", "end": date(2025, 12, 31)}
+
+WEEKDAYS = ["MO", "TU", "WE", "TH", "FR"]
+# 2025-06-02 is a Monday
+MONDAY = date(2025, 6, 2)
+
+
+def schedule_index(*schedule_lists):
+    """Index with one service per list of schedules, named svc0, svc1, ..."""
+    services = {f"svc{i}": {"schedules": list(schedules)} for i, schedules in enumerate(schedule_lists)}
+    return ScheduleIndex.from_schedule_data({"services": services})
+
+
+def days(start, end):
+    """Every date from start through end inclusive."""
+    return [start + timedelta(days=n) for n in range((end - start).days + 1)]
+
+
+class TestActiveSchedule:
+    """Test cases for ScheduleIndex.active_schedule, with find_active_schedule as the reference."""
+
+    @pytest.mark.parametrize(
+        "schedules",
+        [
+            [SUMMER, HOLIDAY, FALL],
+            [HOLIDAY, SUMMER, FALL],
+            [SUMMER, OPEN_ENDED],
+            [OPEN_ENDED, SUMMER],
+            [NULL_END, SUMMER],
+            [NO_START, SUMMER, NO_START],
+            [NO_START],
+            [],
+        ],
+    )
+    def test_matches_linear_scan(self, schedules):
+        """Test that every date from before the first start to after the last end matches the linear scan."""
+        index = schedule_index(schedules)
+        for day in days(date(2025, 1, 1), date(2026, 1, 31)):
+            assert index.active_schedule("svc0", day) is find_active_schedule(schedules, day), day
+
+    def test_overlap_resolves_in_file_order(self):
+        """Test that the first schedule in the file wins where two overlap."""
+        index = schedule_index([SUMMER, HOLIDAY], [HOLIDAY, SUMMER])
+        assert index.active_schedule("svc0", date(2025, 7, 4)) is SUMMER
+        assert index.active_schedule("svc1", date(2025, 7, 4)) is HOLIDAY
+        assert index.active_schedule("svc0", date(2025, 9, 1)) is HOLIDAY
+
+    def test_end_date_is_inclusive(self):
+        """Test that a schedule is active on its end date and not the day after."""
+        index = schedule_index([SUMMER])
+        assert index.active_schedule("svc0", SUMMER["end"]) is SUMMER
+        assert index.active_schedule("svc0", SUMMER["end"] + timedelta(days=1)) is None
+
+    def test_before_first_start(self):
+        """Test that nothing is active before the earliest start date."""
+        index = schedule_index([FALL, SUMMER])
+        assert index.active_schedule("svc0", SUMMER["start"] - timedelta(days=1)) is None
+        assert index.active_schedule("svc0", date.min) is None
+
+    @pytest.mark.parametrize("schedule", [OPEN_ENDED, NULL_END])
+    def test_missing_end_never_ends(self, schedule):
+        """Test that a schedule without an end stays active through date.max."""
+        index = schedule_index([schedule])
+        assert index.active_schedule("svc0", date.max) is schedule
+
+    def test_service_without_schedules(self):
+        """Test that a service with no schedules key has no active schedule."""
+        index = ScheduleIndex.from_schedule_data({"services": {"svc0": {"tzid": "America/New_York"}}})
+        assert index.active_schedule("svc0", date(2025, 7, 4)) is None
+
+    def test_random_schedule_sets(self):
+        """Test random overlapping, open-ended and start-less schedule sets against the linear scan."""
+        rng = random.Random(20250601)
+        first = date(2025, 1, 1)
+        for _ in range(200):
+            schedules = []
+            for n in range(rng.randint(0, 5)):
+                schedule = {"name": f"S{n}"}
+                if rng.random() < 0.9:
+                    schedule["start"] = first + timedelta(days=rng.randint(0, 60))
+                if rng.random() < 0.8:
+                    schedule["end"] = first + timedelta(days=rng.randint(0, 90))
+                elif rng.random() < 0.5:
+                    schedule["end"] = None
+                schedules.append(schedule)
+
+            index = schedule_index(schedules)
+            for day in days(first - timedelta(days=2), first + timedelta(days=95)):
+                assert index.active_schedule("svc0", day) is find_active_schedule(schedules, day)
+
+
+def ferry(time, origin, destination, byday):
+    return {"time": time, "from": origin, "to": destination, "byday": byday}
+
+
+def two_service_data():
+    """Two services whose ferries interleave, including one departure time they share."""
+    return {
+        "services": {
+            "cbl": {
+                "tzid": "America/New_York",
+                "schedules": [
+                    {
+                        "name": "Summer",
+                        "start": date(2025, 6, 1),
+                        "url": "https://example.com/cbl",
+                        "ferries": [
+                            ferry("07:15", "Chebeague Island", "Portland", WEEKDAYS),
+                            ferry("06:30", "Portland", "Chebeague Island", WEEKDAYS + ["SA"]),
+                            ferry("13:00", "Portland", "Chebeague Island", ["SA", "SU"]),
+                        ],
+                    }
+                ],
+            },
+            "ctc": {
+                "schedules": [
+                    {
+                        "name": "Summer",
+                        "start": date(2025, 6, 1),
+                        "ferries": [
+                            ferry("07:15", "Chebeague Island", "Cousins Island", WEEKDAYS),
+                            ferry("06:45", "Cousins Island", "Chebeague Island", ["MO", "WE"]),
+                        ],
+                    }
+                ],
+            },
+        }
+    }
+
+
+def scan_ferries(schedule_data, target_date, use_12h):
+    """(service, time, from, to) for each ferry on target_date, by checking every ferry's byday and sorting."""
+    day_abbrev = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")[target_date.weekday()]
+    found = []
+    for service_name, service_data in schedule_data["services"].items():
+        schedule = find_active_schedule(service_data.get("schedules", []), target_date)
+        for f in schedule["ferries"] if schedule else []:
+            if day_abbrev in f["byday"]:
+                found.append((f["time"], service_name, format_time(f["time"], use_12h), f["from"], f["to"]))
+    found.sort(key=lambda entry: entry[0])
+    return [entry[1:] for entry in found]
+
+
+def summarize(ferries):
+    return [(f.service, f.time, f.start_location, f.end_location) for f in ferries]
+
+
+class TestFerriesFor:
+    """Test cases for ScheduleIndex.ferries_for."""
+
+    @pytest.mark.parametrize("use_12h", [False, True])
+    def test_matches_per_day_scan(self, use_12h):
+        """Test that every day of a week matches a scan over each ferry's byday."""
+        data = two_service_data()
+        index = ScheduleIndex.from_schedule_data(data)
+        for day in days(MONDAY - timedelta(days=7), MONDAY + timedelta(days=6)):
+            assert summarize(index.ferries_for(day, use_12h)) == scan_ferries(data, day, use_12h), day
+
+    def test_equal_times_keep_service_order(self):
+        """Test that departures are merged across services by time, with ties in service order."""
+        index = ScheduleIndex.from_schedule_data(two_service_data())
+        assert summarize(index.ferries_for(MONDAY)) == [
+            ("cbl", "06:30", "Portland", "Chebeague Island"),
+            ("ctc", "06:45", "Cousins Island", "Chebeague Island"),
+            ("cbl", "07:15", "Chebeague Island", "Portland"),
+            ("ctc", "07:15", "Chebeague Island", "Cousins Island"),
+        ]
+
+    def test_12h_and_24h_are_cached_separately(self):
+        """Test that the same index serves 12-hour and 24-hour times without mixing them up."""
+        index = ScheduleIndex.from_schedule_data(two_service_data())
+        assert [f.time for f in index.ferries_for(MONDAY)] == ["06:30", "06:45", "07:15", "07:15"]
+        assert [f.time for f in index.ferries_for(MONDAY, use_12h=True)] == [
+            "6:30 AM",
+            "6:45 AM",
+            "7:15 AM",
+            "7:15 AM",
+        ]
+        assert [f.time for f in index.ferries_for(MONDAY)] == ["06:30", "06:45", "07:15", "07:15"]
+
+    def test_ferry_appears_on_each_byday(self):
+        """Test that a ferry running several days is listed on each of them and no others."""
+        index = ScheduleIndex.from_schedule_data(two_service_data())
+        days_with_1300 = [
+            day.strftime("%a")
+            for day in days(MONDAY, MONDAY + timedelta(days=6))
+            if "13:00" in [f.time for f in index.ferries_for(day)]
+        ]
+        assert days_with_1300 == ["Sat", "Sun"]
+        assert [f.service for f in index.ferries_for(MONDAY + timedelta(days=5))] == ["cbl", "cbl"]
+
+
+class TestDepartureOrder:
+    """Test cases for the integer minutes key departures are sorted on."""
+
+    @pytest.mark.parametrize(
+        "time_str, minutes",
+        [("00:00", 0), ("9:05", 545), ("09:05", 545), ("10:00", 600), ("23:59", 1439), (None, 0), ("TBD", 0)],
+    )
+    def test_minutes_after_midnight(self, time_str, minutes):
+        """Test that HH:MM and H:MM times convert to minutes and unparsable or missing times to 0."""
+        assert _minutes_after_midnight(time_str) == minutes
+
+    def test_unpadded_hour_sorts_numerically(self):
+        """Test that 9:05 sorts before 10:00, unlike a string sort, and unknown times sort first."""
+        data = {
+            "services": {
+                "cbl": {
+                    "schedules": [
+                        {
+                            "name": "Summer",
+                            "start": date(2025, 6, 1),
+                            "ferries": [
+                                ferry("10:00", "Portland", "Chebeague Island", WEEKDAYS),
+                                ferry("9:05", "Chebeague Island", "Portland", WEEKDAYS),
+                                ferry("TBD", "Portland", "Chebeague Island", WEEKDAYS),
+                                ferry(None, "Chebeague Island", "Portland", WEEKDAYS),
+                            ],
+                        }
+                    ]
+                }
+            }
+        }
+        ferries = ScheduleIndex.from_schedule_data(data).ferries_for(MONDAY)
+        assert [f.original_time for f in ferries] == ["TBD", None, "9:05", "10:00"]
+
+
+def ferry_info(start_location, end_location, service="cbl"):
+    return FerryInfo(
+        service=service,
+        service_url="https://example.com/?a=1&b=2",
+        time="06:30",
+        original_time="06:30",
+        sort_key=390,
+        start_location=start_location,
+        end_location=end_location,
+    )
+
+
+class TestFerryRow:
+    """Test cases for the cached ferry_row macro output."""
+
+    @pytest.fixture
+    def env(self):
+        _render_ferry_row_cached.cache_clear()
+        return get_environment(TEMPLATE_DIR)
+
+    def render_inline(self, env, ferry, show_direction_colors):
+        """Row rendered by importing the macro into a template, bypassing the row cache."""
+        template = env.from_string('{% from "ferry_row.html" import ferry_row %}{{ ferry_row(ferry, colors) }}')
+        return template.render(ferry=ferry, colors=show_direction_colors)
+
+    @pytest.mark.parametrize("show_direction_colors", [True, False])
+    def test_cached_row_matches_inline(self, env, show_direction_colors):
+        """Test that a row served from the cache is the row the macro renders in a template."""
+        ferry = ferry_info("Portland", "Chebeague Island")
+        expected = self.render_inline(env, ferry, show_direction_colors)
+
+        assert render_ferry_row(env, ferry, show_direction_colors) == expected
+        assert render_ferry_row(env, ferry, show_direction_colors) == expected
+        assert _render_ferry_row_cached.cache_info().hits == 1
+
+    def test_direction_colors_are_part_of_the_key(self, env):
+        """Test that the same ferry with and without direction colors gets two different rows."""
+        ferry = ferry_info("Portland", "Chebeague Island")
+        colored = render_ferry_row(env, ferry, True)
+        plain = render_ferry_row(env, ferry, False)
+
+        assert "to-chebeague" in colored
+        assert "to-chebeague" not in plain
+        assert render_ferry_row(env, ferry, True) == colored
+
+    def test_strings_are_escaped_once(self, env):
+        """Test that locations, services and links are autoescaped, and not escaped again by the page."""
+        ferry = ferry_info("Bug & <Pier>", "Chebeague Island", service="c&b")
+        row = render_ferry_row(env, ferry, True)
+        assert "Bug &amp; &lt;Pier&gt;" in row
+        assert "C&amp;B" in row
+        assert "?a=1&amp;b=2" in row
+        assert row == self.render_inline(env, ferry, True)
+
+        page = render_day_html(
+            date(2025, 6, 2),
+            [ferry],
+            [],
+            "America/New_York",
+            env.get_template("day.html"),
+            generation_time="2025-06-01 12:00",
+        )
+        assert "Bug &amp; &lt;Pier&gt;" in page
+        assert "&amp;amp;" not in page
+        assert "<Pier>" not in page